@@ -0,0 +1,61 @@
+"""
+Compares the two scoring backends in fresh processes:
+import time, artifact load time, first/steady score latency and peak RSS.
+
+Usage (needs trained models, run `python -m src.models.train` first):
+    python -m benchmarks.bench_model_backends
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child process so each backend starts from a cold interpreter
+CHILD = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+from src.config import settings
+from src.scoring.loader import load_scorer
+t1 = time.perf_counter()
+scorer = load_scorer(settings.MODEL_PATH, sys.argv[1])
+t2 = time.perf_counter()
+patient = {"age": 55, "sex": 1, "cp": 0, "trestbps": 140, "chol": 250, "fbs": 0, "restecg": 0,
+           "thalach": 150, "exang": 1, "oldpeak": 2.3, "slope": 2, "ca": 0, "thal": 2}
+scorer.score(patient)
+t3 = time.perf_counter()
+for _ in range(200):
+    scorer.score(patient)
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_s": t1 - t0,
+    "load_s": t2 - t1,
+    "first_score_ms": (t3 - t2) * 1e3,
+    "steady_score_ms": (t4 - t3) / 200 * 1e3,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [m for m in ("pandas", "sklearn", "xgboost", "joblib") if m in sys.modules],
+}))
+"""
+
+
+def run_backend(backend):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, backend],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    results = {backend: run_backend(backend) for backend in ("sklearn", "numeric")}
+
+    print(f"{'metric':<18}{'sklearn':>12}{'numeric':>12}")
+    for key in ("import_s", "load_s", "first_score_ms", "steady_score_ms", "peak_rss_mb"):
+        print(f"{key:<18}{results['sklearn'][key]:>12.3f}{results['numeric'][key]:>12.3f}")
+    print(f"heavy modules loaded by numeric path: {results['numeric']['heavy_modules'] or 'none'}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Isolated microbenchmarks of each /assess component, written as JSON so a change
+to one component can be tracked from run to run:
+
+  sklearn.encode         pandas get_dummies + reindex + StandardScaler (SklearnScorer.encode)
+  numeric.encode         the NumPy encoding plan of the numeric artifact
+  xgb.predict_proba      XGBClassifier on encoded rows
+  rf.predict             RandomForestRegressor on encoded rows
+  numeric.predict        both numeric tree ensembles on encoded rows
+  bayes.infer            EnvironmentalBayesNet.infer_stress_probability
+  recommender            HeartRecommender.get_recommendations, advice_db enlarged to N items
+
+Scorer components run at batch sizes 1/64/4096 (rows drawn from heart.csv).
+Each timing is the median of --repeat runs, each long enough (--min-time) to
+swamp timer noise, as in timeit.
+
+Usage (needs trained models, run `python -m src.models.train` first):
+    python -m benchmarks.components
+    python -m benchmarks.components --batches 1 64 --advice-sizes 16 1000 --output after.json
+    python -m benchmarks.components --compare before.json --output after.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+from benchmarks.worker_scaling import ROOT
+
+BATCHES = [1, 64, 4096]
+ADVICE_SIZES = [16, 1000, 10000]
+
+
+def measure(fn, min_time=0.2, repeat=5):
+    """Seconds per call of fn(): median and best of `repeat` runs of an autoranged loop count."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - t0 >= min_time:
+            break
+        loops *= 2
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - t0) / loops)
+    return {"median_s": statistics.median(runs), "min_s": min(runs), "loops": loops}
+
+
+def _result(component, timing, batch=1, **extra):
+    return {
+        "component": component,
+        "batch": batch,
+        "median_us": round(timing["median_s"] * 1e6, 3),
+        "min_us": round(timing["min_s"] * 1e6, 3),
+        "per_row_us": round(timing["median_s"] / batch * 1e6, 4),
+        "rows_per_s": round(batch / timing["median_s"], 1),
+        "loops": timing["loops"],
+        **extra,
+    }
+
+
+def patient_rows(n, seed=0):
+    """`n` patients from heart.csv (with replacement) as a raw-feature DataFrame."""
+    import pandas as pd
+    from src.config import settings
+    from src.scoring.numeric_model import RAW_FEATURES
+    df = pd.read_csv(os.path.join(settings.DATA_PATH, "raw", "heart.csv"))[RAW_FEATURES]
+    return df.sample(n=n, replace=True, random_state=seed).reset_index(drop=True)
+
+
+def enlarged_advice_db(size, seed=0):
+    """The real advice_db.json, padded with synthetic items (1-3 real tags each) up to `size`."""
+    from src.config import settings
+    with open(os.path.join(settings.DATA_PATH, "raw", "advice_db.json"), encoding="utf-8") as f:
+        items = json.load(f)
+    tags = sorted({tag for item in items for tag in item["tags"]})
+    rng = random.Random(seed)
+    for i in range(len(items), size):
+        items.append({
+            "id": i + 1,
+            "text": f"Synthetic advice #{i + 1}",
+            "tags": rng.sample(tags, rng.randint(1, 3)),
+            "priority": rng.randint(1, 10),
+        })
+    return items[:size]
+
+
+def bench_scorers(batches, min_time, repeat):
+    from src.config import settings
+    from src.scoring.numeric_model import NumericScorer
+    from src.scoring.loader import NUMERIC_MODEL_FILE
+    from src.scoring.sklearn_model import SklearnScorer
+
+    sk = SklearnScorer.load(settings.MODEL_PATH)
+    numeric = NumericScorer.load(os.path.join(settings.MODEL_PATH, NUMERIC_MODEL_FILE))
+    results = []
+    for batch in batches:
+        df = patient_rows(batch)
+        raw = df.to_numpy(dtype=float)
+        X_sk = sk.encode(df)
+        X_num = numeric.encode(raw)
+
+        results.append(_result("sklearn.encode", measure(lambda: sk.encode(df), min_time, repeat), batch))
+        results.append(_result("numeric.encode", measure(lambda: numeric.encode(raw), min_time, repeat), batch))
+        results.append(_result("xgb.predict_proba", measure(lambda: sk.clf.predict_proba(X_sk), min_time, repeat), batch))
+        results.append(_result("rf.predict", measure(lambda: sk.reg.predict(X_sk), min_time, repeat), batch))
+        results.append(_result("numeric.predict", measure(lambda: numeric.predict_encoded(X_num), min_time, repeat), batch))
+        print(f"  scorers: batch {batch} done", flush=True)
+    return results
+
+
+def bench_bayes(min_time, repeat):
+    from src.utils.bayesian_network import EnvironmentalBayesNet
+    net = EnvironmentalBayesNet()
+    # Cycle through all four CPT cells
+    evidence = [(35.0, 5), (35.0, 1), (20.0, 5), (20.0, 1)]
+
+    def run():
+        for temp, aqi in evidence:
+            net.infer_stress_probability(temp, aqi)
+
+    timing = measure(run, min_time, repeat)
+    timing = {**timing, "median_s": timing["median_s"] / len(evidence), "min_s": timing["min_s"] / len(evidence)}
+    return [_result("bayes.infer", timing)]
+
+
+def bench_recommender(sizes, min_time, repeat):
+    from src.utils.recommender import HeartRecommender
+    recommender = HeartRecommender()
+    patients = patient_rows(64, seed=1).to_dict("records")
+    # Mix of risk bands and environments, so different tag sets are hit
+    cases = [
+        (0.1 + 0.8 * (i % 8) / 7, {"temp": (-5, 20, 35)[i % 3]}, {"aqi": 1 + i % 5}, patient)
+        for i, patient in enumerate(patients)
+    ]
+    results = []
+    for size in sizes:
+        recommender.advice_db = enlarged_advice_db(size)
+
+        def run():
+            for risk, weather, pollution, patient in cases:
+                recommender.get_recommendations(risk, weather, pollution, patient)
+
+        timing = measure(run, min_time, repeat)
+        timing = {**timing, "median_s": timing["median_s"] / len(cases), "min_s": timing["min_s"] / len(cases)}
+        results.append(_result("recommender", timing, advice_items=size))
+    return results
+
+
+def _meta():
+    import numpy
+    versions = {"python": platform.python_version(), "numpy": numpy.__version__}
+    for module in ("pandas", "sklearn", "xgboost"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                            capture_output=True, text=True).stdout.strip() or None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "cpus": os.cpu_count(),
+        "machine": platform.machine(),
+        **versions,
+    }
+
+
+def _key(row):
+    return row["component"], row["batch"], row.get("advice_items")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-component /assess microbenchmarks")
+    parser.add_argument("--batches", type=int, nargs="+", default=BATCHES)
+    parser.add_argument("--advice-sizes", type=int, nargs="+", default=ADVICE_SIZES)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="component_bench.json")
+    parser.add_argument("--compare", help="earlier output to show speedups against")
+    args = parser.parse_args(argv)
+
+    results = (bench_scorers(args.batches, args.min_time, args.repeat)
+               + bench_bayes(args.min_time, args.repeat)
+               + bench_recommender(args.advice_sizes, args.min_time, args.repeat))
+    report = {"meta": _meta(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    before = {}
+    if args.compare:
+        with open(args.compare) as f:
+            before = {_key(row): row for row in json.load(f)["results"]}
+
+    print(f"\n{'component':<20}{'batch':>6}{'items':>7}{'median us':>12}{'us/row':>10}{'rows/s':>12}"
+          + (f"{'speedup':>9}" if before else ""))
+    for row in results:
+        line = (f"{row['component']:<20}{row['batch']:>6}{row.get('advice_items', ''):>7}"
+                f"{row['median_us']:>12.1f}{row['per_row_us']:>10.2f}{row['rows_per_s']:>12.0f}")
+        old = before.get(_key(row))
+        if old:
+            line += f"{old['median_us'] / row['median_us']:>8.2f}x"
+        print(line)
+    print(f"\nWritten to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
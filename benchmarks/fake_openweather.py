@@ -0,0 +1,150 @@
+"""
+Local stand-in for the two OpenWeather endpoints LiveDataClient calls
+(/weather and /air_pollution), with a configurable response delay.
+
+Load tests point the API at it with OPENWEATHER_BASE_URL, so they measure our
+pipeline with a known upstream latency instead of the real API (and its quota).
+Answers are deterministic per city, so repeated runs see the same risk scores.
+
+Usage:
+    python -m benchmarks.fake_openweather --port 8099 --latency-ms 80 --jitter-ms 20
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8099/data/2.5 WEATHER_API_KEY=fake uvicorn src.api.main:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BASE_PATH = "/data/2.5"
+
+
+def weather_for(city):
+    """Stable fake observation for `city`."""
+    seed = zlib.crc32(city.lower().encode())
+    return {
+        "coord": {"lat": round((seed % 18000) / 100 - 90, 2), "lon": round((seed % 36000) / 100 - 180, 2)},
+        "main": {"temp": round(-5 + (seed % 400) / 10, 1), "humidity": 20 + seed % 80},
+        "name": city,
+        # Observation time: OpenWeather refreshes it about every 10 minutes
+        "dt": int(time.time()) // 600 * 600,
+    }
+
+
+def weather_at(lat, lon):
+    """Stable fake observation at a coordinate (what /weather?lat=&lon= answers)."""
+    observation = weather_for(f"{lat:.4f},{lon:.4f}")
+    observation["coord"] = {"lat": lat, "lon": lon}
+    return observation
+
+
+def pollution_for(lat, lon):
+    return {"list": [{"main": {"aqi": 1 + int(abs(lat * 7 + lon * 3)) % 5}}]}
+
+
+class FakeOpenWeather:
+    """
+    Threaded HTTP server on 127.0.0.1. Every response waits latency_ms
+    (+ uniform jitter up to jitter_ms) first, like a remote API would.
+    A `tail_ratio` share of responses waits `tail_ms` more (a slow upstream tail).
+    Setting `fail_status` (e.g. 503) makes every answer that error, as an outage.
+    Usable as a context manager; `base_url` goes into OPENWEATHER_BASE_URL.
+    """
+
+    def __init__(self, latency_ms=50.0, jitter_ms=0.0, port=0, tail_ratio=0.0, tail_ms=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_ratio = tail_ratio
+        self.tail_ms = tail_ms
+        self.requests = 0
+        self.fail_status = None
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                fake.requests += 1
+                delay = fake.latency_ms + random.uniform(0, fake.jitter_ms)
+                if random.random() < fake.tail_ratio:
+                    delay += fake.tail_ms
+                if delay > 0:
+                    time.sleep(delay / 1e3)
+
+                if fake.fail_status:
+                    return self._reply(fake.fail_status, {"cod": fake.fail_status, "message": "unavailable"})
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if "appid" not in query:
+                    return self._reply(401, {"cod": 401, "message": "Invalid API key"})
+                if url.path == f"{BASE_PATH}/weather" and query.get("q"):
+                    return self._reply(200, weather_for(query["q"]))
+                if url.path == f"{BASE_PATH}/weather" and "lat" in query and "lon" in query:
+                    return self._reply(200, weather_at(float(query["lat"]), float(query["lon"])))
+                if url.path == f"{BASE_PATH}/air_pollution" and "lat" in query and "lon" in query:
+                    return self._reply(200, pollution_for(float(query["lat"]), float(query["lon"])))
+                return self._reply(404, {"cod": "404", "message": "not found"})
+
+            def _reply(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openweather", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenWeather API")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--tail-ratio", type=float, default=0.0, help="share of responses delayed by --tail-ms")
+    parser.add_argument("--tail-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeOpenWeather(args.latency_ms, args.jitter_ms, args.port, args.tail_ratio, args.tail_ms)
+    print(f"Fake OpenWeather on {fake.base_url} ({args.latency_ms:.0f} ms + up to {args.jitter_ms:.0f} ms)")
+    with fake:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Local stand-in for the few Redis commands RedisEnvStore uses (GET, SET [NX] [PX|EX],
+DEL, PING), speaking RESP2 so the real `redis` client talks to it unchanged.
+
+Tests and benchmarks use it with ENV_CACHE_URL=redis://127.0.0.1:<port>/0 instead
+of needing a Redis server. Single process, in memory, expiry checked on read.
+
+Usage:
+    python -m benchmarks.fake_redis --port 6390
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class FakeRedis:
+    """Threaded RESP server on 127.0.0.1. Usable as a context manager; `url` goes into ENV_CACHE_URL."""
+
+    def __init__(self, port=0):
+        self.data = {}  # key -> (value, expires at time.monotonic() or None)
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def _get(self, key):
+        value = self.data.get(key)
+        if value is not None and value[1] is not None and value[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return value and value[0]
+
+    def execute(self, args):
+        """Runs one command (list of bytes). Returns the RESP-encoded reply."""
+        command = args[0].upper()
+        with self._lock:
+            self.commands += 1
+            if command == b"PING":
+                return b"+PONG\r\n"
+            if command == b"GET":
+                return _bulk(self._get(args[1]))
+            if command == b"SET":
+                key, value, options = args[1], args[2], [a.upper() for a in args[3:]]
+                expires = None
+                if b"PX" in options:
+                    expires = time.monotonic() + int(args[3 + options.index(b"PX") + 1]) / 1e3
+                elif b"EX" in options:
+                    expires = time.monotonic() + int(args[3 + options.index(b"EX") + 1])
+                if b"NX" in options and self._get(key) is not None:
+                    return b"$-1\r\n"
+                self.data[key] = (value, expires)
+                return b"+OK\r\n"
+            if command == b"DEL":
+                removed = sum(self.data.pop(key, None) is not None for key in args[1:])
+                return b":%d\r\n" % removed
+        if command == b"CLIENT":
+            return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % command
+
+    def _handler(self):
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    args = self._read_command()
+                    if args is None:
+                        return
+                    self.wfile.write(fake.execute(args))
+
+            def _read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                if not line.startswith(b"*"):
+                    return line.split()  # inline command
+                args = []
+                for _ in range(int(line[1:])):
+                    size = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(size + 2)[:-2])
+                return args
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-redis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Redis (GET/SET/DEL only)")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    fake = FakeRedis(args.port)
+    print(f"Fake Redis on {fake.url}")
+    with fake:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
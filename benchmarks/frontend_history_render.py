@@ -0,0 +1,120 @@
+"""
+Render cost of the History tab as the history grows: script run time (AppTest),
+number of elements and bytes sent per rerun.
+
+A local stub API serves N synthetic entries and honours limit/offset like GET /history.
+
+Usage:
+    python -m benchmarks.frontend_history_render --sizes 10 100 1000 5000
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND = os.path.join(ROOT, "frontend")
+HISTORY_TAB = "📊 My History"
+
+
+def make_history(n):
+    return [
+        {"id": n - i, "date": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d} 10:{i % 60:02d}",
+         "age": 40 + i % 40, "risk_score": round((i * 7.3) % 100, 1), "risk_label": "Moderate",
+         "chol": 180 + i % 120, "trestbps": 110 + i % 60, "thalach": 120 + i % 70}
+        for i in range(n)
+    ]
+
+
+def start_stub_api(history):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", [str(len(history))])[0])
+            page = history[offset:offset + limit]
+            body = json.dumps({"history": page, "count": len(page),
+                               "total": len(history), "offset": offset}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _tree_stats(node):
+    count, size = 0, 0
+    if getattr(node, "proto", None) is not None:
+        count, size = 1, node.proto.ByteSize()
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        for child in children.values():
+            c, s = _tree_stats(child)
+            count, size = count + c, size + s
+    return count, size
+
+
+def render_history(runs):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # Same token + version for every size: don't let the history cache carry over
+    st.cache_data.clear()
+    at = AppTest.from_file(os.path.join(FRONTEND, "app.py"), default_timeout=120)
+    at.session_state["token"] = "bench"
+    at.session_state["username"] = "bench"
+    at.run()
+    # The tabs widget only takes a value once it exists; the second run fills the history cache
+    at.session_state["dashboard_tab"] = HISTORY_TAB
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        at.run()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    elements, size = _tree_stats(at._tree)
+    return {"render_ms": statistics.median(samples), "elements": elements, "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History tab render benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'entries':>8}{'render ms':>12}{'elements':>10}{'bytes':>10}")
+    for n in args.sizes:
+        server = start_stub_api(make_history(n))
+        os.environ["API_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            r = results[n] = render_history(args.runs)
+        finally:
+            server.shutdown()
+        print(f"{n:>8}{r['render_ms']:>12.1f}{r['elements']:>10}{r['bytes']:>10}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-call latency of the frontend's API calls: a fresh `requests.get` per call
+(the old behaviour) vs the pooled keep-alive session from frontend/http_client.py.
+
+Runs against a local stub API (HTTP/1.1 keep-alive) with optional server latency.
+
+Usage:
+    python -m benchmarks.frontend_http_session --calls 500 --latency-ms 0
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "frontend"))
+
+from http_client import build_session, API_TIMEOUT  # noqa: E402
+
+HISTORY_BODY = json.dumps({"history": [], "count": 0}).encode()
+
+
+def start_stub_api(latency_s):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Like uvicorn: without TCP_NODELAY, keep-alive responses stall on delayed ACKs
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            if latency_s:
+                time.sleep(latency_s)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(HISTORY_BODY)))
+            self.end_headers()
+            self.wfile.write(HISTORY_BODY)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _time_calls(get, url, calls):
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        get(url, headers={"Authorization": "Bearer bench"}, timeout=API_TIMEOUT).json()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p99_ms": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="frontend -> API session benchmark")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stub server think time")
+    args = parser.parse_args()
+
+    server = start_stub_api(args.latency_ms / 1e3)
+    url = f"http://127.0.0.1:{server.server_address[1]}/history"
+    try:
+        results = {
+            "requests.get per call": _time_calls(requests.get, url, args.calls),
+            "pooled session": _time_calls(build_session().get, url, args.calls),
+        }
+    finally:
+        server.shutdown()
+
+    print(f"{args.calls} GET /history calls, stub latency {args.latency_ms}ms")
+    print(f"{'client':<24}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Bytes the Streamlit server sends per rerun (sum of the serialized element protos),
+with the theme inlined into every rerun vs linked from app/static.
+
+Also prints the stylesheet sizes: raw, minified, and minified + gzip (what the
+browser downloads once and then revalidates via ETag).
+
+Usage:
+    python -m benchmarks.frontend_payload
+"""
+import gzip
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND = os.path.join(ROOT, "frontend")
+sys.path.insert(0, FRONTEND)
+
+# Nothing listens here: the dashboard must render without calling the API
+os.environ.setdefault("API_URL", "http://127.0.0.1:9")
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from assets import STATIC_DIR, minify_css  # noqa: E402
+
+PAGES = {
+    "auth page": {},
+    "dashboard": {"token": "bench", "username": "bench"},
+}
+
+
+def _element_bytes(node):
+    total = node.proto.ByteSize() if getattr(node, "proto", None) is not None else 0
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        total += sum(_element_bytes(child) for child in children.values())
+    return total
+
+
+def rerun_payload(session_state, static_serving):
+    st.config.set_option("server.enableStaticServing", static_serving)
+    at = AppTest.from_file(os.path.join(FRONTEND, "app.py"), default_timeout=30)
+    for key, value in session_state.items():
+        at.session_state[key] = value
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return _element_bytes(at._tree)
+
+
+def main():
+    with open(os.path.join(STATIC_DIR, "theme.css"), 'r', encoding='utf-8') as f:
+        raw = f.read()
+    minified = minify_css(raw)
+    print(f"theme.css: {len(raw.encode())} B raw, {len(minified.encode())} B minified, "
+          f"{len(gzip.compress(minified.encode()))} B minified+gzip (downloaded once)")
+
+    results = {}
+    print(f"{'page':<14}{'inline B/rerun':>16}{'linked B/rerun':>16}")
+    for page, session_state in PAGES.items():
+        inline = rerun_payload(session_state, static_serving=False)
+        linked = rerun_payload(session_state, static_serving=True)
+        results[page] = {"inline": inline, "linked": linked}
+        print(f"{page:<14}{inline:>16}{linked:>16}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Load test of the whole request pipeline over real HTTP.
+
+Starts the API under gunicorn (like production) with OpenWeather replaced by
+benchmarks/fake_openweather.py at a fixed latency, then drives each scenario
+from `--concurrency` client threads for `--duration` seconds:
+
+  token           POST /token (bcrypt password check + JWT)
+  assess          POST /assess, every request fetched from the fake OpenWeather
+                  (cache off: ENV_CACHE_TTL_S=0, cities rotate through the gazetteer)
+  assess_cached   POST /assess, readings from the cache (a few cities, fetched during warm-up)
+  assess_stubbed  POST /assess, no API key -> live data defaults, no network
+  history         GET /history (default page of 10)
+
+Each scenario also reports its OpenWeather calls per measured request, so a
+miss scenario quietly served from the cache (or the other way round) shows.
+
+It reports p50/p95/p99 latency and requests/second per scenario. With
+--baseline it compares against a stored run and exits 1 when a scenario's p95
+or RPS got worse by more than --tolerance. The CI benchmark job compares against
+a run of the base commit made just before, on the same runner.
+
+Usage:
+    python -m benchmarks.load_test --duration 10 --latency-ms 50
+    python -m benchmarks.load_test --output load.json --baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from benchmarks.fake_openweather import FakeOpenWeather
+from benchmarks.startup_report import PATIENT
+from benchmarks.worker_scaling import ROOT, _free_port, _wait_ready
+from src.utils import gazetteer
+
+SCENARIOS = ["token", "assess", "assess_cached", "assess_stubbed", "history"]
+USER = {"username": "loadtest", "password": "loadtest-pass"}
+# API settings per scenario, on top of the fake OpenWeather's (one API process per distinct set)
+SCENARIO_ENV = {
+    "assess": {"ENV_CACHE_TTL_S": "0"},
+    "assess_stubbed": {"WEATHER_API_KEY": ""},
+}
+CACHED_CITIES = 16
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, errors, elapsed, upstream_calls=None):
+    latencies = sorted(latencies)
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1e3, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1e3, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1e3, 3),
+    }
+    if upstream_calls is not None:
+        result["openweather_calls_per_request"] = round(upstream_calls / max(1, len(latencies) + errors), 3)
+    return result
+
+
+def _request_for(scenario, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    if scenario == "token":
+        return lambda client: client.post("/token", data=USER)
+    if scenario in ("assess", "assess_cached"):
+        labels = [place.label for place in gazetteer.default().places]
+        # Every cell in turn (misses), or the same few over and over (hits)
+        cities = itertools.cycle(labels if scenario == "assess" else labels[:CACHED_CITIES])
+        return lambda client: client.post("/assess", json={**PATIENT, "city": next(cities)}, headers=headers)
+    if scenario == "assess_stubbed":
+        return lambda client: client.post("/assess", json=PATIENT, headers=headers)
+    if scenario == "history":
+        return lambda client: client.get("/history", headers=headers)
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def drive(base_url, send, duration, concurrency, warmup=1.0, upstream=None):
+    """
+    Closed loop: each thread sends its next request as soon as the last one answered.
+    `upstream()` (the fake OpenWeather's request count) is read as measuring starts and stops.
+    """
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start_at = time.perf_counter() + warmup
+    stop_at = start_at + duration
+
+    def worker(i):
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            while True:
+                t0 = time.perf_counter()
+                if t0 >= stop_at:
+                    return
+                r = send(client)
+                t1 = time.perf_counter()
+                if t0 < start_at:
+                    continue  # warm-up: connections, caches, gunicorn worker imports
+                if r.status_code == 200:
+                    latencies[i].append(t1 - t0)
+                else:
+                    errors[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    calls = None
+    if upstream is not None:
+        time.sleep(max(0.0, start_at - time.perf_counter()))
+        calls = upstream()
+        time.sleep(max(0.0, stop_at - time.perf_counter()))
+        calls = upstream() - calls
+    for t in threads:
+        t.join()
+    return summarize([x for per_thread in latencies for x in per_thread], sum(errors), duration, calls)
+
+
+def _start_api(port, workdir, workers, extra_env):
+    env = dict(os.environ)
+    env.update({
+        "PORT": str(port),
+        "WEB_CONCURRENCY": str(workers),
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        "SERVER_TIMING": "false",
+    })
+    env.update(extra_env)
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", os.devnull,
+         "src.api.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def run_scenarios(scenarios, api_env, args, upstream=None):
+    """Runs `scenarios` against one API process started with `api_env`."""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        server = _start_api(port, workdir, args.workers, api_env)
+        try:
+            _wait_ready(base_url)
+            httpx.post(f"{base_url}/register", json=USER)
+            token = httpx.post(f"{base_url}/token", data=USER).json()["access_token"]
+            # /history has something to page through
+            for _ in range(20):
+                httpx.post(f"{base_url}/assess", json=PATIENT, headers={"Authorization": f"Bearer {token}"})
+            for scenario in scenarios:
+                results[scenario] = drive(base_url, _request_for(scenario, token), args.duration,
+                                          args.concurrency, upstream=upstream)
+                print(_row(scenario, results[scenario]), flush=True)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Regressions against `baseline` as strings ([] when everything is within tolerance)."""
+    regressions = []
+    for scenario, base in baseline["scenarios"].items():
+        now = results["scenarios"].get(scenario)
+        if now is None:
+            continue
+        if now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{scenario}: p95 {base['p95_ms']:.1f} -> {now['p95_ms']:.1f} ms")
+        if now["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{scenario}: {base['rps']:.1f} -> {now['rps']:.1f} req/s")
+        if now["errors"] > base["errors"]:
+            regressions.append(f"{scenario}: {now['errors']} errors (baseline {base['errors']})")
+    return regressions
+
+
+def _row(name, r):
+    return (f"{name:<16}{r['requests']:>9}{r['errors']:>7}{r['rps']:>9.1f}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+            f"{r.get('openweather_calls_per_request', float('nan')):>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Request pipeline load test")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake OpenWeather latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="extra uniform random latency")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative p95 increase / RPS drop before failing")
+    parser.add_argument("--save-baseline", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} CPU(s), {args.workers} worker(s), {args.concurrency} client threads, "
+          f"{args.duration:.0f}s per scenario, OpenWeather {args.latency_ms:.0f}+{args.jitter_ms:.0f} ms")
+    print(f"{'scenario':<16}{'requests':>9}{'errors':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'OW/req':>10}")
+
+    scenarios = {}
+    groups = {}
+    for scenario in args.scenarios:
+        groups.setdefault(json.dumps(SCENARIO_ENV.get(scenario, {}), sort_keys=True), []).append(scenario)
+    with FakeOpenWeather(args.latency_ms, args.jitter_ms) as fake:
+        for env, group in groups.items():
+            api_env = {"WEATHER_API_KEY": "load-test", "OPENWEATHER_BASE_URL": fake.base_url,
+                       "ENV_CACHE_URL": "", **json.loads(env)}
+            scenarios.update(run_scenarios(group, api_env, args, upstream=lambda: fake.requests))
+
+    results = {
+        "meta": {
+            "cpus": os.cpu_count(), "python": platform.python_version(), "workers": args.workers,
+            "concurrency": args.concurrency, "duration_s": args.duration,
+            "openweather_latency_ms": args.latency_ms, "openweather_jitter_ms": args.jitter_ms,
+        },
+        "scenarios": {name: scenarios[name] for name in args.scenarios},
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%} against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nWithin {args.tolerance:.0%} of {args.baseline}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-request cost of the /assess stage instrumentation: a StageTimer with one lap
+per stage, the histogram observations, and the Server-Timing header string. Plus
+the bucketing the histogram's background thread does, per request, and the
+slowest single record() call (the request path never buckets).
+
+Usage:
+    python -m benchmarks.metrics_overhead --requests 200000
+"""
+import argparse
+import time
+
+from src.api.metrics import ASSESS_STAGES, Histogram, StageTimer
+
+
+def _per_request_us(fn, requests):
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return (time.perf_counter() - t0) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/assess instrumentation overhead")
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+
+    histogram = Histogram("bench_seconds", "bench", "stage")
+    # Folded only when asked, to time bucketing on its own
+    unfolded = Histogram("bench_unfolded_seconds", "bench", "stage", fold_interval_s=3600)
+
+    def timer_only():
+        timer = StageTimer()
+        for stage in ASSESS_STAGES:
+            timer.lap(stage)
+
+    def timer_and_histogram():
+        timer = StageTimer()
+        for stage in ASSESS_STAGES:
+            timer.lap(stage)
+        timer.finish(histogram)
+
+    def timer_and_unfolded_histogram():
+        timer = StageTimer()
+        for stage in ASSESS_STAGES:
+            timer.lap(stage)
+        timer.finish(unfolded)
+
+    def with_server_timing():
+        timer = StageTimer()
+        for stage in ASSESS_STAGES:
+            timer.lap(stage)
+        timer.finish(histogram)
+        timer.server_timing()
+
+    results = {
+        "laps only": _per_request_us(timer_only, args.requests),
+        "laps + histograms": _per_request_us(timer_and_histogram, args.requests),
+        "laps + histograms + Server-Timing": _per_request_us(with_server_timing, args.requests),
+    }
+    _per_request_us(timer_and_unfolded_histogram, args.requests)
+    t0 = time.perf_counter()
+    unfolded.render()
+    results["bucketing (background thread)"] = (time.perf_counter() - t0) / args.requests * 1e6
+
+    slowest = 0.0
+    stages = [(stage, 0.001) for stage in ASSESS_STAGES]
+    for _ in range(args.requests):
+        t0 = time.perf_counter()
+        unfolded.record(stages)
+        slowest = max(slowest, time.perf_counter() - t0)
+
+    print(f"{len(ASSESS_STAGES)} stages, {args.requests} simulated requests")
+    for name, us in results.items():
+        print(f"{name:<38}{us:>8.2f} us/request")
+    print(f"{'slowest record() call':<38}{slowest * 1e6:>8.2f} us")
+    return results
+
+
+if __name__ == "__main__":
+    main()
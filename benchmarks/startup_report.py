@@ -0,0 +1,144 @@
+"""
+Cold-start report for the API.
+
+1. Import profile: runs `python -X importtime -c "import src.api.main"` and
+   aggregates self time per top-level package.
+2. First request: boots the app against a throwaway SQLite DB, then times the
+   first and second POST /assess (live data is skipped: no API key).
+
+Usage:
+    python -m benchmarks.startup_report [--json] [--top 15]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_MODULE = "src.api.main"
+
+PATIENT = {
+    "age": 55, "sex": 1, "cp": 0, "trestbps": 140, "chol": 250, "fbs": 0, "restecg": 0,
+    "thalach": 150, "exang": 1, "oldpeak": 2.3, "slope": 2, "ca": 0, "thal": 2, "city": "London"
+}
+
+IMPORT_PROBE = r"""
+import time
+t0 = time.perf_counter()
+import src.api.main
+print(time.perf_counter() - t0)
+"""
+
+REQUEST_PROBE = r"""
+import json, sys, time
+from fastapi.testclient import TestClient
+from src.api.main import app
+
+patient = json.loads(sys.argv[1])
+t0 = time.perf_counter()
+with TestClient(app, raise_server_exceptions=False) as client:
+    t1 = time.perf_counter()
+    client.post("/register", json={"username": "startup_probe", "password": "probe-pass"})
+    token = client.post("/token", data={"username": "startup_probe", "password": "probe-pass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    t2 = time.perf_counter()
+    first = client.post("/assess", json=patient, headers=headers)
+    t3 = time.perf_counter()
+    client.post("/assess", json=patient, headers=headers)
+    t4 = time.perf_counter()
+
+print(json.dumps({
+    "app_startup_s": t1 - t0,
+    "first_request_s": t3 - t2,
+    "second_request_s": t4 - t3,
+    "first_status": first.status_code,
+}))
+"""
+
+
+def _probe_env(workdir):
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'startup_probe.db')}"
+    # Empty key -> LiveDataClient answers with defaults instead of calling OpenWeather
+    env["WEATHER_API_KEY"] = ""
+    env["PYTHONPATH"] = ROOT
+    return env
+
+
+def _run(args, workdir):
+    return subprocess.run(
+        [sys.executable] + args, cwd=workdir, env=_probe_env(workdir),
+        capture_output=True, text=True, check=True
+    )
+
+
+def measure_import_time(runs=3):
+    """Wall time to import the API module in a fresh interpreter (best of `runs`)."""
+    with tempfile.TemporaryDirectory() as workdir:
+        return min(float(_run(["-c", IMPORT_PROBE], workdir).stdout.strip()) for _ in range(runs))
+
+
+def import_profile(top=15):
+    """Self time per top-level package, from -X importtime."""
+    with tempfile.TemporaryDirectory() as workdir:
+        out = _run(["-X", "importtime", "-c", f"import {API_MODULE}"], workdir)
+
+    per_package = defaultdict(int)
+    total_us = 0
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        per_package[name.split(".")[0]] += int(self_us)
+        if name == API_MODULE:
+            total_us = int(cumulative_us)
+
+    ranked = sorted(per_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {
+        "total_s": total_us / 1e6,
+        "packages": [{"package": name, "self_s": us / 1e6} for name, us in ranked],
+    }
+
+
+def measure_first_request():
+    with tempfile.TemporaryDirectory() as workdir:
+        out = _run(["-c", REQUEST_PROBE, json.dumps(PATIENT)], workdir)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API cold-start report")
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    args = parser.parse_args()
+
+    report = {
+        "import_wall_s": measure_import_time(),
+        "import_profile": import_profile(args.top),
+        "first_request": measure_first_request(),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+
+    print(f"Import {API_MODULE}: {report['import_wall_s']:.3f}s wall "
+          f"({report['import_profile']['total_s']:.3f}s under -X importtime)")
+    print(f"\n{'package':<24}{'self time (s)':>14}")
+    for row in report['import_profile']['packages']:
+        print(f"{row['package']:<24}{row['self_s']:>14.4f}")
+
+    fr = report["first_request"]
+    print(f"\nApp startup:     {fr['app_startup_s']:.3f}s")
+    print(f"First /assess:   {fr['first_request_s'] * 1e3:.1f}ms (status {fr['first_status']})")
+    print(f"Second /assess:  {fr['second_request_s'] * 1e3:.1f}ms")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+pytest-benchmark microbenchmarks of the request pipeline, in-process through
+TestClient (the over-the-wire numbers come from benchmarks/load_test.py).
+OpenWeather is benchmarks/fake_openweather.py, BENCH_OPENWEATHER_LATENCY_MS
+per call (default 20).
+
+Not part of the normal test run (pytest.ini only collects tests/):
+    pytest benchmarks/test_request_pipeline.py --benchmark-json=bench.json
+    pytest benchmarks/test_request_pipeline.py --benchmark-autosave      # then later:
+    pytest benchmarks/test_request_pipeline.py --benchmark-compare --benchmark-compare-fail=mean:25%
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.fake_openweather import FakeOpenWeather
+from benchmarks.startup_report import PATIENT
+
+# Settings are read at import time, so the environment goes in before src is imported
+_workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+_fake = FakeOpenWeather(float(os.getenv("BENCH_OPENWEATHER_LATENCY_MS", "20"))).start()
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_workdir, 'bench.db')}",
+    "WEATHER_API_KEY": "bench",
+    "OPENWEATHER_BASE_URL": _fake.base_url,
+    "SERVER_TIMING": "false",
+})
+
+from fastapi.testclient import TestClient
+from src.api import context as api_context
+from src.api.main import app
+from src.utils.live_data import LiveDataClient
+
+USER = {"username": "bench", "password": "bench-pass"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        if api_context.current_context() is None:
+            pytest.skip("Models are not trained (python -m src.models.train)")
+        c.post("/register", json=USER)
+        yield c
+    _fake.stop()
+
+
+@pytest.fixture(scope="module")
+def headers(client):
+    token = client.post("/token", data=USER).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def stubbed_live_data():
+    # No key: LiveDataClient answers with its defaults without any network call
+    live = api_context.current_context()
+    offline = LiveDataClient()
+    offline.api_key = ""
+    api_context.set_inference_context(live.replace(sensor=offline))
+    yield
+    api_context.set_inference_context(live)
+
+
+def _ok(response):
+    assert response.status_code == 200, response.text
+    return response
+
+
+class TestRequestPipeline:
+    def test_token(self, benchmark, client):
+        benchmark(lambda: _ok(client.post("/token", data=USER)))
+
+    def test_assess(self, benchmark, client, headers):
+        calls_before = _fake.requests
+        benchmark(lambda: _ok(client.post("/assess", json=PATIENT, headers=headers)))
+        assert _fake.requests > calls_before
+
+    def test_assess_stubbed_live_data(self, benchmark, client, headers, stubbed_live_data):
+        calls_before = _fake.requests
+        benchmark(lambda: _ok(client.post("/assess", json=PATIENT, headers=headers)))
+        assert _fake.requests == calls_before
+
+    def test_history(self, benchmark, client, headers):
+        benchmark(lambda: _ok(client.get("/history", headers=headers)))
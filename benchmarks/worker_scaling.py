@@ -0,0 +1,143 @@
+"""
+Throughput and memory of the gunicorn multi-worker mode, for 1..N workers.
+
+For every worker count it starts `gunicorn -c gunicorn.conf.py`, waits for
+/ready, drives POST /assess from a thread pool for a fixed duration and
+reports requests/second plus RSS and PSS summed over master + workers
+(PSS counts copy-on-write shared pages once, so it shows what preload saves).
+
+Usage:
+    python -m benchmarks.worker_scaling --workers 1 2 4 --duration 15
+    python -m benchmarks.worker_scaling --workers 4 --no-preload
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from benchmarks.startup_report import PATIENT
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _memory_kb(pid):
+    """(rss, pss) in kB for one process, from /proc (Linux only)."""
+    rss = pss = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1])
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1])
+    return rss, pss
+
+
+def _process_tree(pid):
+    children = subprocess.run(["pgrep", "-P", str(pid)], capture_output=True, text=True).stdout.split()
+    return [pid] + [int(c) for c in children]
+
+
+def _wait_ready(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API did not become ready")
+
+
+def _drive(base_url, token, duration, concurrency):
+    counts = [0] * concurrency
+    errors = [0] * concurrency
+    stop_at = time.perf_counter() + duration
+
+    def worker(i):
+        headers = {"Authorization": f"Bearer {token}"}
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            while time.perf_counter() < stop_at:
+                r = client.post("/assess", json=PATIENT, headers=headers)
+                if r.status_code == 200:
+                    counts[i] += 1
+                else:
+                    errors[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / duration, sum(errors)
+
+
+def run(workers, duration, concurrency, preload):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ)
+        env.update({
+            "PORT": str(port),
+            "WEB_CONCURRENCY": str(workers),
+            "GUNICORN_PRELOAD": "true" if preload else "false",
+            "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'scaling.db')}",
+            "WEATHER_API_KEY": "",
+        })
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", os.devnull,
+             "src.api.main:app"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _wait_ready(base_url)
+            httpx.post(f"{base_url}/register", json={"username": "bench", "password": "bench-pass"})
+            token = httpx.post(f"{base_url}/token",
+                               data={"username": "bench", "password": "bench-pass"}).json()["access_token"]
+
+            # Let every worker finish booting before measuring
+            time.sleep(2)
+            rss, pss = map(sum, zip(*(_memory_kb(p) for p in _process_tree(server.pid))))
+            rps, errors = _drive(base_url, token, duration, concurrency)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {"workers": workers, "rps": rps, "errors": errors,
+            "rss_mb": rss / 1024, "pss_mb": pss / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gunicorn worker scaling benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load per run")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--no-preload", action="store_true", help="load models in every worker")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s), preload={'off' if args.no_preload else 'on'}, "
+          f"{args.concurrency} client threads, {args.duration:.0f}s per run")
+    print(f"{'workers':>8}{'req/s':>10}{'errors':>8}{'RSS MB':>10}{'PSS MB':>10}")
+    results = []
+    for n in args.workers:
+        r = run(n, args.duration, args.concurrency, preload=not args.no_preload)
+        results.append(r)
+        print(f"{r['workers']:>8}{r['rps']:>10.1f}{r['errors']:>8}{r['rss_mb']:>10.1f}{r['pss_mb']:>10.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
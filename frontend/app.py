@@ -2,6 +2,8 @@ import streamlit as st
 import requests
 import os
 import time
+from http_client import build_session, API_TIMEOUT, ASSESS_TIMEOUT
+from assets import publish_stylesheet, stylesheet_tag
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -13,6 +15,20 @@ st.set_page_config(
 
 # --- API CONFIG ---
 API_URL = os.getenv("API_URL", "http://api:8000")
+# History is cached per token for this long (and refreshed after every new assessment)
+HISTORY_CACHE_TTL = int(os.getenv("HISTORY_CACHE_TTL", "300"))
+# Entries per history page (one table: the grid is virtualized, so big pages stay cheap)
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "100"))
+
+@st.cache_resource
+def get_http():
+    """One pooled keep-alive session (with retries) per Streamlit server process"""
+    return build_session()
+
+@st.cache_resource
+def get_theme():
+    """Minified theme stylesheet, published once per Streamlit server process"""
+    return publish_stylesheet("theme.css")
 
 # --- SESSION STATE ---
 if 'token' not in st.session_state:
@@ -23,14 +39,19 @@ if 'just_registered' not in st.session_state:
     st.session_state.just_registered = False
 if 'show_welcome' not in st.session_state:
     st.session_state.show_welcome = False
+if 'history_version' not in st.session_state:
+    # Bumped after each successful assessment to invalidate the cached history
+    st.session_state.history_version = 0
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
 
 # --- API FUNCTIONS ---
 def login(username, password):
     try:
-        response = requests.post(
+        response = get_http().post(
             f"{API_URL}/token",
             data={"username": username, "password": password},
-            timeout=10
+            timeout=API_TIMEOUT
         )
         if response.status_code == 200:
             return True, response.json()
@@ -43,10 +64,10 @@ def login(username, password):
 
 def register(username, password):
     try:
-        response = requests.post(
+        response = get_http().post(
             f"{API_URL}/register",
             json={"username": username, "password": password},
-            timeout=10
+            timeout=API_TIMEOUT
         )
         if response.status_code == 201:
             return True, "Account created successfully!"
@@ -60,13 +81,16 @@ def register(username, password):
 def assess_patient(data, token):
     try:
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.post(
+        response = get_http().post(
             f"{API_URL}/assess",
             json=data,
             headers=headers,
-            timeout=30
+            timeout=ASSESS_TIMEOUT
         )
         if response.status_code == 200:
+            # A new entry exists now, so the cached history is stale
+            st.session_state.history_version += 1
+            st.session_state.history_page = 0
             return True, response.json()
         elif response.status_code == 401:
             st.session_state.token = None
@@ -78,657 +102,9 @@ def assess_patient(data, token):
         return False, str(e)
 
 # --- PROFESSIONAL CSS - Dark Medical Theme ---
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-    
-    :root {
-        --bg-primary: #0a0f1a;
-        --bg-secondary: #111827;
-        --bg-card: #1f2937;
-        --bg-input: #374151;
-        --accent-blue: #3b82f6;
-        --accent-blue-hover: #2563eb;
-        --accent-green: #10b981;
-        --accent-orange: #f59e0b;
-        --accent-red: #ef4444;
-        --text-primary: #f9fafb;
-        --text-secondary: #9ca3af;
-        --text-muted: #6b7280;
-        --border-color: #374151;
-        --gradient-start: #3b82f6;
-        --gradient-end: #8b5cf6;
-    }
-    
-    * {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-    
-    /* Hide Streamlit defaults */
-    #MainMenu, footer, header {visibility: hidden;}
-    .stDeployButton {display: none;}
-    div[data-testid="stToolbar"] {display: none;}
-    div[data-testid="stDecoration"] {display: none;}
-    
-    /* Main background */
-    .stApp {
-        background: var(--bg-primary);
-    }
-    
-    .main .block-container {
-        padding: 0 !important;
-        max-width: 100% !important;
-    }
-    
-    /* ========== NAVBAR ========== */
-    .navbar {
-        background: var(--bg-secondary);
-        border-bottom: 1px solid var(--border-color);
-        padding: 0.75rem 2rem;
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        position: sticky;
-        top: 0;
-        z-index: 1000;
-    }
-    
-    .nav-brand {
-        display: flex;
-        align-items: center;
-        gap: 0.75rem;
-    }
-    
-    .nav-logo {
-        width: 40px;
-        height: 40px;
-        background: linear-gradient(135deg, var(--gradient-start), var(--gradient-end));
-        border-radius: 10px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 1.25rem;
-    }
-    
-    .nav-title {
-        font-size: 1.25rem;
-        font-weight: 700;
-        color: var(--text-primary);
-        letter-spacing: -0.5px;
-    }
-    
-    /* Hamburger Menu */
-    .menu-toggle {
-        display: flex;
-        flex-direction: column;
-        gap: 5px;
-        cursor: pointer;
-        padding: 8px;
-    }
-    
-    .menu-toggle span {
-        width: 24px;
-        height: 3px;
-        background: var(--text-primary);
-        border-radius: 2px;
-        transition: 0.3s;
-    }
-    
-    /* Sidebar styling */
-    [data-testid="stSidebar"] {
-        background: var(--bg-secondary) !important;
-        border-right: 1px solid var(--border-color);
-    }
-    
-    [data-testid="stSidebar"] > div {
-        background: var(--bg-secondary) !important;
-    }
-    
-    [data-testid="stSidebarContent"] {
-        background: var(--bg-secondary) !important;
-    }
-    
-    .nav-profile {
-        display: flex;
-        align-items: center;
-        gap: 1rem;
-    }
-    
-    .user-info {
-        display: flex;
-        align-items: center;
-        gap: 0.75rem;
-        background: var(--bg-card);
-        padding: 0.5rem 1rem;
-        border-radius: 50px;
-        border: 1px solid var(--border-color);
-    }
-    
-    .user-avatar {
-        width: 32px;
-        height: 32px;
-        background: linear-gradient(135deg, var(--accent-green), #059669);
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 0.875rem;
-        font-weight: 600;
-        color: white;
-    }
-    
-    .user-name {
-        color: var(--text-primary);
-        font-weight: 500;
-        font-size: 0.9rem;
-    }
-    
-    .user-role {
-        color: var(--text-muted);
-        font-size: 0.75rem;
-    }
-    
-    /* ========== AUTH PAGE ========== */
-    .auth-container {
-        min-height: 100vh;
-        display: flex;
-        background: var(--bg-primary);
-    }
-    
-    .auth-left {
-        flex: 1;
-        background: linear-gradient(135deg, #1e3a5f 0%, #0a0f1a 100%);
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-        padding: 4rem;
-    }
-    
-    .auth-hero-title {
-        font-size: 3rem;
-        font-weight: 800;
-        color: var(--text-primary);
-        line-height: 1.2;
-        margin-bottom: 1.5rem;
-    }
-    
-    .auth-hero-title span {
-        background: linear-gradient(135deg, var(--gradient-start), var(--gradient-end));
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-    
-    .auth-hero-desc {
-        color: var(--text-secondary);
-        font-size: 1.125rem;
-        line-height: 1.7;
-        max-width: 500px;
-    }
-    
-    .auth-features {
-        display: flex;
-        gap: 2rem;
-        margin-top: 3rem;
-    }
-    
-    .auth-feature {
-        display: flex;
-        align-items: center;
-        gap: 0.75rem;
-    }
-    
-    .auth-feature-icon {
-        width: 44px;
-        height: 44px;
-        background: rgba(59, 130, 246, 0.15);
-        border-radius: 12px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 1.25rem;
-    }
-    
-    .auth-feature-text {
-        color: var(--text-secondary);
-        font-size: 0.9rem;
-    }
-    
-    .auth-right {
-        width: 480px;
-        background: var(--bg-secondary);
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-        padding: 3rem;
-    }
-    
-    .auth-card {
-        background: var(--bg-card);
-        border-radius: 20px;
-        padding: 2.5rem;
-        border: 1px solid var(--border-color);
-    }
-    
-    .auth-header {
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    
-    .auth-logo {
-        width: 64px;
-        height: 64px;
-        background: linear-gradient(135deg, var(--gradient-start), var(--gradient-end));
-        border-radius: 16px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 1.75rem;
-        margin: 0 auto 1rem;
-    }
-    
-    .auth-title {
-        font-size: 1.5rem;
-        font-weight: 700;
-        color: var(--text-primary);
-        margin-bottom: 0.25rem;
-    }
-    
-    .auth-subtitle {
-        color: var(--text-muted);
-        font-size: 0.9rem;
-    }
-    
-    /* ========== FORM INPUTS ========== */
-    .stTextInput > label, .stSelectbox > label, .stNumberInput > label {
-        color: var(--text-secondary) !important;
-        font-weight: 500 !important;
-        font-size: 0.875rem !important;
-        margin-bottom: 0.5rem !important;
-    }
-    
-    .stTextInput > div > div > input {
-        background: var(--bg-input) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: 10px !important;
-        padding: 0.875rem 1rem !important;
-        font-size: 0.95rem !important;
-        color: var(--text-primary) !important;
-        transition: all 0.2s ease !important;
-    }
-    
-    .stTextInput > div > div > input:focus {
-        border-color: var(--accent-blue) !important;
-        box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.15) !important;
-    }
-    
-    .stTextInput > div > div > input::placeholder {
-        color: var(--text-muted) !important;
-    }
-    
-    .stNumberInput > div > div > input {
-        background: var(--bg-input) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: 10px !important;
-        color: var(--text-primary) !important;
-    }
-    
-    .stSelectbox > div > div {
-        background: var(--bg-input) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: 10px !important;
-    }
-    
-    .stSelectbox > div > div > div {
-        color: var(--text-primary) !important;
-    }
-    
-    /* ========== BUTTONS ========== */
-    .stButton > button {
-        background: linear-gradient(135deg, var(--gradient-start), var(--gradient-end)) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 10px !important;
-        padding: 0.875rem 1.5rem !important;
-        font-size: 0.95rem !important;
-        font-weight: 600 !important;
-        transition: all 0.3s ease !important;
-        box-shadow: 0 4px 15px rgba(59, 130, 246, 0.3) !important;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px) !important;
-        box-shadow: 0 6px 20px rgba(59, 130, 246, 0.4) !important;
-    }
-    
-    /* Logout button */
-    .logout-btn button {
-        background: transparent !important;
-        border: 1px solid var(--border-color) !important;
-        color: var(--text-secondary) !important;
-        box-shadow: none !important;
-        padding: 0.5rem 1rem !important;
-        font-size: 0.85rem !important;
-    }
-    
-    .logout-btn button:hover {
-        background: rgba(239, 68, 68, 0.1) !important;
-        border-color: var(--accent-red) !important;
-        color: var(--accent-red) !important;
-        transform: none !important;
-        box-shadow: none !important;
-    }
-    
-    /* ========== TABS ========== */
-    .stTabs [data-baseweb="tab-list"] {
-        background: var(--bg-input);
-        border-radius: 12px;
-        padding: 4px;
-        gap: 4px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;
-        border-radius: 8px;
-        color: var(--text-muted);
-        font-weight: 500;
-        padding: 0.75rem 1.5rem;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: var(--accent-blue) !important;
-        color: white !important;
-    }
-    
-    /* ========== FEATURE CARDS ========== */
-    .feature-card {
-        background: var(--bg-card);
-        border-radius: 16px;
-        padding: 1.5rem;
-        text-align: center;
-        border: 1px solid var(--border-color);
-        transition: all 0.3s ease;
-    }
-    
-    .feature-card:hover {
-        border-color: var(--accent-blue);
-        transform: translateY(-3px);
-    }
-    
-    .feature-icon {
-        font-size: 2rem;
-        margin-bottom: 0.75rem;
-    }
-    
-    .feature-title {
-        font-weight: 600;
-        color: var(--text-primary);
-        font-size: 0.95rem;
-        margin-bottom: 0.25rem;
-    }
-    
-    .feature-desc {
-        font-size: 0.8rem;
-        color: var(--text-muted);
-    }
-    
-    /* ========== WELCOME BANNER PRO ========== */
-    .welcome-banner-pro {
-        background: linear-gradient(135deg, rgba(59, 130, 246, 0.1), rgba(139, 92, 246, 0.1));
-        border: 1px solid rgba(59, 130, 246, 0.2);
-        border-radius: 20px;
-        padding: 3rem 2rem;
-        text-align: center;
-        margin: 2rem 0;
-    }
-    
-    .welcome-icon-row {
-        font-size: 2.5rem;
-        margin-bottom: 1rem;
-        display: flex;
-        justify-content: center;
-        gap: 0.5rem;
-    }
-    
-    .welcome-title-pro {
-        font-size: 2rem;
-        font-weight: 700;
-        color: var(--text-primary);
-        margin-bottom: 1rem;
-        background: linear-gradient(135deg, var(--gradient-start), var(--gradient-end));
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-    
-    .welcome-desc-pro {
-        color: var(--text-secondary);
-        font-size: 1.1rem;
-        line-height: 1.7;
-        max-width: 600px;
-        margin: 0 auto;
-    }
-    
-    /* ========== WELCOME BANNER ========== */
-    .welcome-banner {
-        background: linear-gradient(135deg, rgba(16, 185, 129, 0.15), rgba(59, 130, 246, 0.15));
-        border: 1px solid rgba(16, 185, 129, 0.3);
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 2rem;
-        text-align: center;
-    }
-    
-    .welcome-emoji {
-        font-size: 3rem;
-        margin-bottom: 1rem;
-    }
-    
-    .welcome-title {
-        font-size: 1.75rem;
-        font-weight: 700;
-        color: var(--text-primary);
-        margin-bottom: 0.5rem;
-    }
-    
-    .welcome-message {
-        color: var(--text-secondary);
-        font-size: 1rem;
-        max-width: 500px;
-        margin: 0 auto;
-        line-height: 1.6;
-    }
-    
-    /* ========== CONTENT AREA ========== */
-    .content-area {
-        padding: 2rem 3rem;
-        max-width: 1400px;
-        margin: 0 auto;
-    }
-    
-    .page-header {
-        margin-bottom: 2rem;
-    }
-    
-    .page-title {
-        font-size: 1.75rem;
-        font-weight: 700;
-        color: var(--text-primary);
-        margin-bottom: 0.5rem;
-    }
-    
-    .page-desc {
-        color: var(--text-secondary);
-        font-size: 1rem;
-    }
-    
-    /* ========== FORM SECTIONS ========== */
-    .form-section {
-        background: var(--bg-card);
-        border-radius: 16px;
-        padding: 1.5rem;
-        margin-bottom: 1.5rem;
-        border: 1px solid var(--border-color);
-    }
-    
-    .section-header {
-        display: flex;
-        align-items: center;
-        gap: 0.75rem;
-        margin-bottom: 1.25rem;
-        padding-bottom: 1rem;
-        border-bottom: 1px solid var(--border-color);
-    }
-    
-    .section-icon {
-        width: 40px;
-        height: 40px;
-        background: rgba(59, 130, 246, 0.15);
-        border-radius: 10px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 1.1rem;
-    }
-    
-    .section-title {
-        font-size: 1rem;
-        font-weight: 600;
-        color: var(--text-primary);
-    }
-    
-    /* ========== RESULT CARDS ========== */
-    .result-card {
-        border-radius: 20px;
-        padding: 3rem 2rem;
-        text-align: center;
-        margin: 2rem 0;
-    }
-    
-    .result-card.high {
-        background: linear-gradient(135deg, #dc2626, #991b1b);
-    }
-    
-    .result-card.moderate {
-        background: linear-gradient(135deg, #d97706, #b45309);
-    }
-    
-    .result-card.low {
-        background: linear-gradient(135deg, #059669, #047857);
-    }
-    
-    .result-score {
-        font-size: 4rem;
-        font-weight: 800;
-        color: white;
-        line-height: 1;
-    }
-    
-    .result-label {
-        font-size: 1.25rem;
-        color: rgba(255,255,255,0.9);
-        margin-top: 0.75rem;
-        font-weight: 500;
-    }
-    
-    /* ========== ENV CARDS ========== */
-    .env-grid {
-        display: grid;
-        grid-template-columns: repeat(4, 1fr);
-        gap: 1rem;
-        margin: 1.5rem 0;
-    }
-    
-    .env-card {
-        background: var(--bg-card);
-        border-radius: 14px;
-        padding: 1.25rem;
-        text-align: center;
-        border: 1px solid var(--border-color);
-    }
-    
-    .env-icon {
-        font-size: 1.75rem;
-        margin-bottom: 0.5rem;
-    }
-    
-    .env-value {
-        font-size: 1.25rem;
-        font-weight: 700;
-        color: var(--text-primary);
-    }
-    
-    .env-label {
-        font-size: 0.8rem;
-        color: var(--text-muted);
-        margin-top: 0.25rem;
-    }
-    
-    /* ========== RECOMMENDATIONS ========== */
-    .rec-item {
-        background: rgba(59, 130, 246, 0.1);
-        border-left: 4px solid var(--accent-blue);
-        padding: 1rem 1.25rem;
-        border-radius: 0 12px 12px 0;
-        margin-bottom: 0.75rem;
-        color: var(--text-primary);
-        font-size: 0.95rem;
-    }
-    
-    /* ========== ALERT ========== */
-    .alert-box {
-        background: rgba(239, 68, 68, 0.15);
-        border: 1px solid rgba(239, 68, 68, 0.3);
-        border-radius: 12px;
-        padding: 1rem 1.25rem;
-        color: #fca5a5;
-        font-weight: 500;
-        margin-top: 1.5rem;
-    }
-    
-    /* ========== SUCCESS MESSAGE ========== */
-    .success-msg {
-        background: rgba(16, 185, 129, 0.15);
-        border: 1px solid rgba(16, 185, 129, 0.3);
-        border-radius: 12px;
-        padding: 1rem;
-        color: #6ee7b7;
-        text-align: center;
-        margin: 1rem 0;
-    }
-    
-    /* ========== FOOTER ========== */
-    .footer {
-        text-align: center;
-        padding: 2rem;
-        margin-top: 2rem;
-        border-top: 1px solid var(--border-color);
-        color: var(--text-muted);
-        font-size: 0.875rem;
-    }
-    
-    /* Slider */
-    .stSlider > div > div > div > div {
-        background: var(--accent-blue) !important;
-    }
-    
-    .stSlider > div > div > div > div > div {
-        background: var(--accent-blue) !important;
-    }
-    
-    /* Hide anchor links */
-    .css-15zrgzn, .css-zt5igj, a[href^="#"] {display: none !important;}
-    
-    /* Markdown text color */
-    .stMarkdown, .stMarkdown p, .stMarkdown li {
-        color: var(--text-primary) !important;
-    }
-    
-    h1, h2, h3, h4, h5, h6 {
-        color: var(--text-primary) !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+# The sheet lives in static/theme.css; each rerun only sends a one-line @import of it
+st.markdown(stylesheet_tag(get_theme(), st.get_option("server.enableStaticServing")),
+            unsafe_allow_html=True)
 
 # === AUTHENTICATION PAGE ===
 def show_auth_page():
@@ -892,69 +268,125 @@ def show_dashboard():
         st.session_state.show_welcome = False
     
     # Tabs for Assessment and History
-    tab_assess, tab_history = st.tabs(["📋 New Assessment", "📊 My History"])
-    
-    with tab_assess:
-        show_assessment_form()
-    
-    with tab_history:
-        show_history()
+    # on_change="rerun" makes the tabs stateful, so only the open tab's content runs
+    tab_assess, tab_history = st.tabs(
+        ["📋 New Assessment", "📊 My History"], key="dashboard_tab", on_change="rerun"
+    )
+    
+    if tab_assess.open:
+        with tab_assess:
+            show_assessment_form()
+    
+    if tab_history.open:
+        with tab_history:
+            show_history()
 
-def get_history(token):
-    """Fetch user's assessment history"""
+@st.cache_data(ttl=HISTORY_CACHE_TTL, max_entries=1000, show_spinner=False)
+def fetch_history(token, version, offset=0):
+    """
+    Cached GET /history page, keyed by token + history_version + offset.
+    Raises on failure so errors are never cached.
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    response = get_http().get(
+        f"{API_URL}/history",
+        params={"limit": HISTORY_PAGE_SIZE, "offset": offset},
+        headers=headers,
+        timeout=API_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()
+
+def get_history(token, offset=0):
+    """Fetch one page of the user's assessment history"""
     try:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(f"{API_URL}/history", headers=headers, timeout=10)
-        if response.status_code == 200:
-            return True, response.json()
+        return True, fetch_history(token, st.session_state.history_version, offset)
+    except requests.exceptions.HTTPError:
         return False, "Failed to load history"
     except Exception as e:
         return False, str(e)
 
+def risk_band(score):
+    """Same percentage-based bands as the assessment result (>=60% = High Risk)"""
+    if score >= 60:
+        return "🔴 High Risk"
+    elif score >= 30:
+        return "🟠 Moderate"
+    return "🟢 Low Risk"
+
+def sparkline_svg(scores, width=600, height=48):
+    """Inline SVG trend line for 0-100 scores (a few hundred bytes, no chart library)"""
+    if len(scores) < 2:
+        return ""
+    step = width / (len(scores) - 1)
+    points = " ".join(
+        f"{i * step:.1f},{height - 2 - (score / 100) * (height - 4):.1f}" for i, score in enumerate(scores)
+    )
+    return f"""<svg viewBox="0 0 {width} {height}" preserveAspectRatio="none"
+        style="width: 100%; height: {height}px; display: block;">
+        <polyline points="{points}" fill="none" stroke="#3b82f6" stroke-width="2"
+                  vector-effect="non-scaling-stroke"/>
+    </svg>"""
+
+def turn_history_page(step):
+    st.session_state.history_page += step
+
 def show_history():
-    """Display user's assessment history"""
-    success, data = get_history(st.session_state.token)
-    
+    """
+    Display user's assessment history: a trend sparkline + one table per page.
+    A fixed number of elements whatever the history length (no per-entry cards).
+    """
+    page = st.session_state.history_page
+    success, data = get_history(st.session_state.token, page * HISTORY_PAGE_SIZE)
+
+    if success and not data.get('history') and page > 0:
+        # The page we were on is gone (history shrank): go back to the newest entries
+        st.session_state.history_page = 0
+        st.rerun()
+
     if success and data.get('history'):
+        total = data.get('total', data['count'])
+        pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+        # Trend over this page, oldest -> newest
+        trend = sparkline_svg([item['risk_score'] for item in reversed(data['history'])])
         st.markdown(f"""
         <div style="margin-bottom: 1.5rem;">
             <h3 style="color: #f9fafb; font-size: 1.25rem;">Your Assessment History</h3>
-            <p style="color: #6b7280;">You have {data['count']} previous assessments</p>
+            <p style="color: #6b7280;">You have {total} previous assessments</p>{trend}
         </div>
         """, unsafe_allow_html=True)
-        
-        for item in data['history']:
-            # Use percentage-based logic (>=60% = High Risk)
-            score = item['risk_score']
-            if score >= 60:
-                risk_color = "#ef4444"
-                risk_label = "High Risk"
-            elif score >= 30:
-                risk_color = "#f59e0b"
-                risk_label = "Moderate"
-            else:
-                risk_color = "#10b981"
-                risk_label = "Low Risk"
-            
-            st.markdown(f"""
-            <div style="background: #1f2937; border-radius: 12px; padding: 1.25rem; margin-bottom: 1rem; 
-                        border-left: 4px solid {risk_color};">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div>
-                        <div style="color: #f9fafb; font-weight: 600; font-size: 1rem;">
-                            Risk Score: {item['risk_score']}%
-                        </div>
-                        <div style="color: #6b7280; font-size: 0.85rem; margin-top: 0.25rem;">
-                            {item['date']} • Age: {item['age']} • BP: {item['trestbps']} • Chol: {item['chol']}
-                        </div>
-                    </div>
-                    <div style="background: {risk_color}; color: white; padding: 0.5rem 1rem; 
-                                border-radius: 20px; font-size: 0.8rem; font-weight: 600;">
-                        {risk_label}
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+
+        rows = [{
+            "Date": item['date'],
+            "Risk Score": item['risk_score'],
+            "Risk": risk_band(item['risk_score']),
+            "Age": item['age'],
+            "BP": item['trestbps'],
+            "Chol": item['chol'],
+            "Max HR": item.get('thalach'),
+        } for item in data['history']]
+
+        st.dataframe(
+            rows,
+            hide_index=True,
+            column_config={
+                "Risk Score": st.column_config.ProgressColumn(
+                    min_value=0, max_value=100, format="%.1f%%"
+                ),
+            },
+        )
+
+        if pages > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                st.button("← Newer", key="history_prev", disabled=page == 0,
+                          on_click=turn_history_page, args=(-1,))
+            with page_col:
+                st.markdown(f"<p style='text-align: center; color: #6b7280;'>Page {page + 1} of {pages}</p>",
+                            unsafe_allow_html=True)
+            with next_col:
+                st.button("Older →", key="history_next", disabled=page >= pages - 1,
+                          on_click=turn_history_page, args=(1,))
     else:
         st.markdown("""
         <div style="text-align: center; padding: 3rem; background: #1f2937; border-radius: 16px;">
@@ -964,6 +396,23 @@ def show_history():
         </div>
         """, unsafe_allow_html=True)
 
+@st.cache_data(ttl=3600, max_entries=1000, show_spinner=False)
+def fetch_cities(prefix):
+    """
+    Cached GET /cities labels for a typed prefix (the gazetteer is static).
+    Raises on failure so errors are never cached.
+    """
+    response = get_http().get(f"{API_URL}/cities", params={"prefix": prefix, "limit": 20}, timeout=API_TIMEOUT)
+    response.raise_for_status()
+    return [city["label"] for city in response.json()["cities"]]
+
+def city_options(prefix):
+    try:
+        return fetch_cities(prefix.strip()) if prefix.strip() else []
+    except requests.exceptions.RequestException:
+        # No suggestions: the typed name is sent as is
+        return []
+
 def show_assessment_form():
     """The main assessment form"""
     # Page Header
@@ -973,7 +422,12 @@ def show_assessment_form():
         <p style="color: #9ca3af; font-size: 0.95rem;">Complete the form below for your personalized AI-powered risk evaluation.</p>
     </div>
     """, unsafe_allow_html=True)
-    
+
+    # Outside the form, so typing reruns the page and refreshes the suggestions below
+    city_search = st.text_input("🔎 Find your city", value="London",
+                                help="Type the start of a city name, then pick it under Demographics & Location")
+    cities = city_options(city_search)
+
     with st.form("assessment_form"):
         # Section 1: Demographics
         st.markdown("""
@@ -991,7 +445,11 @@ def show_assessment_form():
         with d2:
             sex = st.selectbox("Biological Sex", options=["Male", "Female"])
         with d3:
-            city = st.text_input("City (for weather data)", value="London")
+            if cities:
+                # The gazetteer is small: a city it doesn't list can still be typed in
+                city = st.selectbox("City (for weather data)", options=cities, accept_new_options=True)
+            else:
+                city = st.text_input("City (for weather data)", value=city_search)
         
         # Section 2: Vital Signs
         st.markdown("""
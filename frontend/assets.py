@@ -0,0 +1,59 @@
+"""
+Theme stylesheet handling. The CSS lives in static/theme.css and is served by
+Streamlit's static file server (server.enableStaticServing, see .streamlit/config.toml),
+so a rerun only sends a one-line <style>@import</style> instead of the whole sheet.
+app.py wraps publish_stylesheet() in st.cache_resource: it runs once per server process.
+"""
+import hashlib
+import os
+import re
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+# Relative to the page, so it also works behind server.baseUrlPath
+STATIC_URL = "app/static"
+
+_COMMENTS = re.compile(r"/\*.*?\*/", re.S)
+_WHITESPACE = re.compile(r"\s+")
+_AROUND_PUNCT = re.compile(r"\s*([{};,>])\s*")
+_AFTER_COLON = re.compile(r":\s+")
+
+
+def minify_css(css):
+    """Drops comments and redundant whitespace. Good enough for our own sheet (no strings with spaces)."""
+    css = _COMMENTS.sub("", css)
+    css = _WHITESPACE.sub(" ", css)
+    css = _AROUND_PUNCT.sub(r"\1", css)
+    css = _AFTER_COLON.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def publish_stylesheet(name="theme.css", static_dir=STATIC_DIR):
+    """
+    Minifies static/<name> into static/<stem>.<hash>.min.css and returns {"url", "css"}.
+    The content hash in the file name changes with the sheet, so a browser can keep
+    the cached copy (revalidated via ETag / Last-Modified) until we ship a new theme.
+    "url" is None when the static dir isn't writable; callers then inline "css".
+    """
+    with open(os.path.join(static_dir, name), 'r', encoding='utf-8') as f:
+        css = minify_css(f.read())
+
+    digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]
+    min_name = f"{os.path.splitext(name)[0]}.{digest}.min.css"
+    min_path = os.path.join(static_dir, min_name)
+    try:
+        if not os.path.exists(min_path):
+            # Write + rename so a concurrent reader never sees half a file
+            tmp_path = f"{min_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(css)
+            os.replace(tmp_path, min_path)
+    except OSError:
+        return {"url": None, "css": css}
+    return {"url": f"{STATIC_URL}/{min_name}", "css": css}
+
+
+def stylesheet_tag(theme, static_serving):
+    """The markdown to emit on every rerun: an @import of the served file, or the inline fallback."""
+    if static_serving and theme["url"]:
+        return f'<style>@import url("{theme["url"]}");</style>'
+    return f"<style>{theme['css']}</style>"
@@ -0,0 +1,44 @@
+"""
+Pooled, keep-alive HTTP session for frontend -> API calls.
+app.py wraps build_session() in st.cache_resource, so there is one session
+(and one connection pool) per Streamlit server process.
+"""
+import os
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds
+API_TIMEOUT = (3.05, 10)
+ASSESS_TIMEOUT = (3.05, 30)
+
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", "20"))
+MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+
+
+def build_session():
+    retry = Retry(
+        total=MAX_RETRIES,
+        # Connection errors mean the request never reached the API: safe to retry any method
+        connect=MAX_RETRIES,
+        # Read errors / 5xx are only retried for idempotent methods (GET, ...),
+        # so a slow POST /assess can never be stored twice
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        backoff_factor=0.2,  # 0.2s, 0.4s, 0.8s ...
+        respect_retry_after_header=True,
+        # Hand the last response back instead of raising, the callers check status codes
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # The session is shared by every user of this server process: never keep cookies
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
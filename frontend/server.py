@@ -0,0 +1,42 @@
+"""
+ASGI entry point: app.py wrapped in st.App so static assets get real cache headers.
+Streamlit's app/static route sends no Cache-Control, which leaves browsers guessing.
+
+Run with:  streamlit run server.py   (same flags as app.py)
+"""
+import re
+
+import streamlit as st
+from starlette.datastructures import MutableHeaders
+from starlette.middleware import Middleware
+
+# theme.<sha256[:12]>.min.css (see assets.publish_stylesheet) and the font files never change
+# under the same URL; anything else under app/static must be revalidated
+IMMUTABLE_ASSET = re.compile(r"/app/static/(.+\.[0-9a-f]{12}\.min\.css|fonts/.+)$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+class StaticCacheHeaders:
+    """Pure ASGI middleware: adds Cache-Control to successful app/static responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "") if scope["type"] == "http" else ""
+        if "/app/static/" not in path:
+            await self.app(scope, receive, send)
+            return
+
+        policy = IMMUTABLE if IMMUTABLE_ASSET.search(path) else REVALIDATE
+
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                MutableHeaders(scope=message)["Cache-Control"] = policy
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
+
+
+app = st.App("app.py", middleware=[Middleware(StaticCacheHeaders)])
@@ -0,0 +1,26 @@
+# Gunicorn config for multi-worker mode:
+#   gunicorn -c gunicorn.conf.py src.api.main:app
+#
+# With preload_app the master imports the app and loads the models once
+# (on_starting below); workers are forked afterwards and share that memory
+# copy-on-write instead of each loading their own copy.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+
+def on_starting(server):
+    # Runs in the master after the preloaded app import, before any fork
+    if preload_app:
+        from src.api.main import preload_system
+        preload_system()
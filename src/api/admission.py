@@ -0,0 +1,154 @@
+"""
+Adaptive concurrency limit for POST /assess (AIMD on observed latency).
+
+Every /assess holds a slot from its arrival (before auth, so time spent queueing for
+the threadpool or the CPU counts too) to its response. A completion is "slow" when
+it took longer than both ADMISSION_TARGET_MS and ADMISSION_TOLERANCE x the fastest
+completion of the last minute or so. That baseline follows OpenWeather: if it gets
+slower for everyone, the baseline rises with it and nothing is shed for that alone.
+Time spent queueing behind other requests pushes a completion over the line.
+
+While completions are fast, the limit grows by about one slot per `limit` completions
+(as long as it is actually being used). A slow one multiplies it by ADMISSION_BACKOFF,
+at most once per round of in-flight requests. A request arriving over the limit gets
+503 with Retry-After straight away instead of queueing in uvicorn until everything
+times out.
+
+Priority: a share of the limit (ADMISSION_PRIORITY_RESERVE) only admits users whose
+last assessment, within ADMISSION_PRIORITY_WINDOW_S, came out High Risk, so their
+retries still get through when everyone else is being shed.
+
+Per process: with several gunicorn workers each one adapts its own limit.
+"""
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from src.api.metrics import ASSESS_CONCURRENCY_LIMIT, ASSESS_IN_FLIGHT
+from src.config import settings
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial=20, min_limit=2, max_limit=200, target_s=1.0, backoff=0.9,
+                 priority_reserve=0.2, tolerance=2.0, baseline_window_s=60.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_s = target_s
+        self.backoff = backoff
+        self.priority_reserve = priority_reserve
+        self.tolerance = tolerance
+        self.in_flight = 0
+        # Fastest completion per time slot, the last few slots make up the baseline
+        self.slot_s = baseline_window_s / 6
+        self._fastest = deque(maxlen=6)  # [slot number, fastest latency]
+        # Smoothed latency of admitted requests, for Retry-After
+        self.latency_s = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def normal_capacity(self):
+        """Slots ordinary requests may hold; the rest are reserved for priority ones."""
+        return max(1, math.floor(self.limit * (1.0 - self.priority_reserve)))
+
+    def try_acquire(self, priority=False):
+        """Takes a slot. Returns the admission time to hand back to release(), or None if full."""
+        with self._lock:
+            capacity = math.floor(self.limit) if priority else self.normal_capacity()
+            if self.in_flight >= capacity:
+                return None
+            self.in_flight += 1
+            return time.perf_counter()
+
+    def baseline_s(self):
+        """Fastest completion over the baseline window (None before the first one)."""
+        return min((fastest for _, fastest in self._fastest), default=None)
+
+    def threshold_s(self):
+        """Completions slower than this shrink the limit."""
+        baseline = self.baseline_s()
+        return self.target_s if baseline is None else max(self.target_s, baseline * self.tolerance)
+
+    def release(self, started):
+        """Gives the slot back and adapts the limit to how long the request took."""
+        now = time.perf_counter()
+        latency = now - started
+        with self._lock:
+            used = self.in_flight
+            self.in_flight -= 1
+            self.latency_s = latency if not self.latency_s else 0.9 * self.latency_s + 0.1 * latency
+            slot = int(now // self.slot_s)
+            if self._fastest and self._fastest[-1][0] == slot:
+                self._fastest[-1][1] = min(self._fastest[-1][1], latency)
+            else:
+                self._fastest.append([slot, latency])
+
+            if latency > self.threshold_s():
+                # Requests admitted before the last cut were slow because of what came
+                # before it; don't cut again for them
+                if started > self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+            elif used * 2 >= self.limit:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def retry_after_s(self):
+        """Whole seconds a shed client should wait: about one request's worth of latency."""
+        return max(1, math.ceil(self.latency_s))
+
+
+def recently_high_risk(session, username, window_s):
+    """True if the user's latest assessment, within `window_s` seconds, was High Risk."""
+    from src.models.prediction_model import Prediction
+    from src.models.user_model import User
+    latest = session.query(Prediction.risk_label, Prediction.timestamp).join(
+        User, Prediction.user_id == User.id
+    ).filter(User.username == username).order_by(
+        Prediction.timestamp.desc(), Prediction.id.desc()
+    ).first()
+    if latest is None or latest.risk_label != "High Risk":
+        return False
+    timestamp = latest.timestamp
+    if timestamp.tzinfo is None:
+        # SQLite hands datetimes back naive; they were stored in UTC
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - timestamp <= timedelta(seconds=window_s)
+
+
+def is_priority(authorization, window_s):
+    """
+    Whether a request that found the ordinary slots full may use the reserve: its
+    bearer token must be valid and its user's last assessment High Risk. Runs before
+    get_current_user (admission comes first), so it checks the token itself.
+    """
+    from jose import JWTError, jwt
+    from sqlmodel import Session
+    from src.auth.security import ALGORITHM, SECRET_KEY
+    from src.db import database
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        username = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return False
+    if username is None:
+        return False
+    with Session(database.engine) as session:
+        return recently_high_risk(session, username, window_s)
+
+
+limiter = AdaptiveLimiter(
+    initial=settings.ADMISSION_INITIAL_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    target_s=settings.ADMISSION_TARGET_MS / 1e3,
+    backoff=settings.ADMISSION_BACKOFF,
+    priority_reserve=settings.ADMISSION_PRIORITY_RESERVE,
+    tolerance=settings.ADMISSION_TOLERANCE,
+)
+ASSESS_CONCURRENCY_LIMIT.set_function(lambda: round(limiter.limit, 2))
+ASSESS_IN_FLIGHT.set_function(lambda: limiter.in_flight)
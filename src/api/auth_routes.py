@@ -13,7 +13,7 @@ router = APIRouter(tags=["Authentication"])
 class UserCreate(BaseModel):
     username: str
     password: str  # Plain text input
-    role: str = "user"
+    # No role: every new account is a "user"; admins are made on the server (src/auth/roles.py)
 
 @router.post("/register", status_code=201)
 def register(user_input: UserCreate, session: Session = Depends(get_session)): # 👈 Use UserCreate here
@@ -30,7 +30,7 @@ def register(user_input: UserCreate, session: Session = Depends(get_session)): #
     new_user = User(
         username=user_input.username,
         hashed_password=hashed_pwd, # Store the hash
-        role=user_input.role
+        role="user"
     )
     
     # 5. Save to DB
@@ -0,0 +1,94 @@
+from fastapi import HTTPException
+from src.api import result_cache
+from src.scoring.loader import load_scorer, load_screen
+from src.utils.live_data import LiveDataClient
+from src.utils.bayesian_network import EnvironmentalBayesNet
+from src.utils.recommender import HeartRecommender
+
+
+class InferenceContext:
+    """
+    Everything /assess needs, built and validated once.
+    Immutable: a reload builds a new context and swaps it in whole,
+    so a request never sees a half-loaded mix of old and new parts.
+    """
+    __slots__ = ("scorer", "sensor", "brain", "advisor", "screen", "shadow", "startup_report")
+
+    def __init__(self, scorer, sensor, brain, advisor, screen=None, shadow=None, startup_report=None):
+        parts = {"scorer": scorer, "sensor": sensor, "brain": brain, "advisor": advisor}
+        missing = [name for name, value in parts.items() if value is None]
+        if missing:
+            raise ValueError(f"InferenceContext is missing: {', '.join(missing)}")
+
+        for name, value in parts.items():
+            object.__setattr__(self, name, value)
+        # Optional: without a screening model every request runs the full ensemble
+        object.__setattr__(self, "screen", screen)
+        # Optional: candidate models scoring the same patients in the background
+        object.__setattr__(self, "shadow", shadow)
+        object.__setattr__(self, "startup_report", startup_report)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("InferenceContext is immutable; build a new one and swap it in")
+
+    def __delattr__(self, name):
+        raise AttributeError("InferenceContext is immutable; build a new one and swap it in")
+
+    def replace(self, **changes):
+        """Returns a copy with some fields changed (like dataclasses.replace)."""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return InferenceContext(**fields)
+
+    @property
+    def backend(self):
+        return type(self.scorer).__name__
+
+
+def build_inference_context(model_path, backend="auto", cascade=False, shadow_path="",
+                            shadow_backend="auto", shadow_queue_size=1024, shadow_window=10000,
+                            shadow_max_duty=0.1):
+    """Loads the models and logic layers. Raises if anything is missing."""
+    scorer = load_scorer(model_path, backend)
+    shadow = None
+    if shadow_path:
+        from src.api.shadow import ShadowRunner
+        from src.api.warmup import SYNTHETIC_PATIENTS
+        # A patient both bundles encode, to tell whether the live encoding can be reused
+        probe = {k: v for k, v in SYNTHETIC_PATIENTS[1].items() if k != "city"}
+        shadow = ShadowRunner(load_scorer(shadow_path, shadow_backend), scorer, shadow_queue_size,
+                              shadow_window, probe=probe, max_duty=shadow_max_duty)
+    return InferenceContext(
+        scorer=scorer,
+        screen=load_screen(model_path) if cascade else None,
+        shadow=shadow,
+        sensor=LiveDataClient(),
+        brain=EnvironmentalBayesNet(),
+        advisor=HeartRecommender(),
+    )
+
+
+# The live context. Swapping is a single reference assignment, so it's atomic:
+# in-flight requests finish on the context they were handed.
+_current = None
+
+
+def current_context():
+    return _current
+
+
+def set_inference_context(context):
+    global _current
+    previous, _current = _current, context
+    if previous is not None and previous.shadow is not None and previous.shadow is not context.shadow:
+        previous.shadow.close()
+    # Results of the previous models are dead weight now
+    result_cache.clear()
+
+
+def get_inference_context():
+    """FastAPI dependency: the live context, or 503 while models aren't loaded."""
+    context = _current
+    if context is None:
+        raise HTTPException(status_code=503, detail="Models are not loaded yet")
+    return context
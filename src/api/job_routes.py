@@ -0,0 +1,110 @@
+import os
+import uuid
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from sqlmodel import Session
+from src.config import settings
+from src.db.database import get_session
+from src.models.user_model import User
+from src.models.job_model import AssessmentJob
+from src.auth.security import get_current_user
+from src.api import jobs
+
+router = APIRouter(tags=["Batch Jobs"])
+
+UPLOAD_BLOCK = 1 << 20
+
+def job_status(job):
+    progress = round(job.rows_done / job.rows_total, 4) if job.rows_total else 0.0
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "rows_total": job.rows_total,
+        "rows_done": job.rows_done,
+        "progress": 1.0 if job.status == "done" else progress,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "result_url": f"/jobs/{job.id}/result" if job.status == "done" else None,
+    }
+
+def get_own_job(job_id, user, session):
+    """The job, if it exists and belongs to `user`. Results are patient data: nobody else sees them, admins included."""
+    job = session.get(AssessmentJob, job_id)
+    if job is None or job.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs/assess", status_code=202)
+def submit_assessment_job(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """
+    Upload a CSV (or Parquet) of patients with the heart.csv feature columns.
+    Returns 202 and a job id right away; poll GET /jobs/{id}.
+    Plain def: the disk writes, the header parse (pandas) and the commit run on the
+    threadpool, not the event loop.
+    """
+    from src.scoring import bulk
+
+    filename = os.path.basename(file.filename or "upload.csv")
+    if not filename.lower().endswith((".csv", ".parquet")):
+        raise HTTPException(status_code=400, detail="Upload a .csv or .parquet file")
+
+    job_id = uuid.uuid4().hex
+    path = jobs.input_path(job_id, filename)
+    os.makedirs(settings.JOBS_DIR, exist_ok=True)
+
+    # Stream to disk in blocks: the upload is never held in memory whole
+    limit = settings.JOB_MAX_UPLOAD_MB * 1024 * 1024
+    size = 0
+    with open(path, "wb") as out:
+        while block := file.file.read(UPLOAD_BLOCK):
+            size += len(block)
+            if size > limit:
+                out.close()
+                os.remove(path)
+                raise HTTPException(status_code=413, detail=f"Upload is larger than {settings.JOB_MAX_UPLOAD_MB} MB")
+            out.write(block)
+
+    # Fail fast on the wrong columns instead of in the background
+    try:
+        header = next(bulk.read_chunks(path, 1)).columns
+    except Exception:
+        header = None
+    missing = bulk.missing_columns(header) if header is not None else None
+    if header is None or missing:
+        os.remove(path)
+        detail = f"Missing columns: {', '.join(missing)}" if missing else "Could not read the file"
+        raise HTTPException(status_code=400, detail=detail)
+
+    job = AssessmentJob(id=job_id, user_id=current_user.id, filename=filename)
+    session.add(job)
+    session.commit()
+    jobs.runner.submit(job_id)
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+@router.get("/jobs/{job_id}")
+def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """Status and progress (rows_done / rows_total) of one job."""
+    return job_status(get_own_job(job_id, current_user, session))
+
+@router.get("/jobs/{job_id}/result")
+def download_job_result(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    """The scored file (every input column + prob_disease, severity_raw, base_risk), streamed."""
+    job = get_own_job(job_id, current_user, session)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    stem = os.path.splitext(job.filename)[0]
+    return FileResponse(jobs.result_path(job.id), media_type="text/csv", filename=f"{stem}.scored.csv")
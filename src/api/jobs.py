@@ -0,0 +1,203 @@
+"""
+Background scoring of uploaded patient files (POST /jobs/assess).
+
+The upload is saved under JOBS_DIR and an AssessmentJob row is queued in the
+database. A small thread pool per API process claims the job with a conditional
+UPDATE (so with several gunicorn workers exactly one of them runs it), scores the
+file chunk by chunk with the live scorer's vectorized predict_frame, and bumps the
+row's progress + heartbeat after every chunk. Results go to a partial file of
+their own per run and are renamed to <id>.csv when complete. The upload is
+deleted once the job is done or failed.
+
+On startup every process calls resume(): queued jobs are picked up again, and
+running jobs whose heartbeat is older than JOB_LEASE_S (their process died) are
+requeued and start over from the first row. The same check then runs every
+JOB_LEASE_S / 2, so a job whose worker crashed and came back within the lease
+(heartbeat still fresh at startup) is requeued once its heartbeat runs out.
+Progress is only written while the row is still this run's claim (status
+running, same started_at): a worker that was merely slow, and got its job
+requeued, stops at its next chunk instead of racing the new run.
+"""
+import os
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from sqlalchemy import or_, update
+from sqlmodel import Session
+
+from src.config import settings
+from src.db import database
+from src.models.job_model import AssessmentJob, utcnow
+
+
+class ClaimLost(Exception):
+    """This run's job was requeued (its heartbeat looked stale) and may be running elsewhere."""
+
+
+def input_path(job_id, filename):
+    extension = ".parquet" if filename.lower().endswith(".parquet") else ".csv"
+    return os.path.join(settings.JOBS_DIR, f"{job_id}.input{extension}")
+
+
+def result_path(job_id):
+    return os.path.join(settings.JOBS_DIR, f"{job_id}.csv")
+
+
+class JobRunner:
+    def __init__(self, workers=2, chunk_size=5000, lease_s=120, sweep_s=None):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.lease_s = lease_s
+        self.sweep_s = lease_s / 2 if sweep_s is None else sweep_s
+        self._pool = None
+        self._sweeper = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        # Created on first use: gunicorn forks after the app is imported, and threads don't survive a fork
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="assess-job")
+            return self._pool
+
+    def submit(self, job_id):
+        return self._executor().submit(self.run, job_id)
+
+    def reclaim(self):
+        """Requeues running jobs whose heartbeat is older than the lease (their process died). Returns their ids."""
+        stale = utcnow() - timedelta(seconds=self.lease_s)
+        orphaned = (
+            AssessmentJob.status == "running",
+            or_(AssessmentJob.heartbeat_at == None, AssessmentJob.heartbeat_at < stale),  # noqa: E711
+        )
+        reclaimed = []
+        with Session(database.engine) as session:
+            for job in session.query(AssessmentJob).filter(*orphaned).all():
+                # Conditional: another process's sweep may have requeued (and restarted) it meanwhile
+                if session.exec(
+                    update(AssessmentJob)
+                    .where(AssessmentJob.id == job.id, *orphaned)
+                    .values(status="queued", rows_done=0, started_at=None, heartbeat_at=None)
+                ).rowcount == 1:
+                    reclaimed.append(job.id)
+            session.commit()
+        return reclaimed
+
+    def resume(self):
+        """Requeues orphaned jobs, submits every queued job and starts the periodic sweep. Returns their ids."""
+        self.reclaim()
+        with Session(database.engine) as session:
+            queued = [job.id for job in session.query(AssessmentJob).filter(AssessmentJob.status == "queued")]
+        for job_id in queued:
+            self.submit(job_id)
+        with self._lock:
+            if self._sweeper is None and self.sweep_s > 0:
+                self._stopped.clear()
+                self._sweeper = threading.Thread(target=self._sweep, name="assess-job-sweep", daemon=True)
+                self._sweeper.start()
+        return queued
+
+    def _sweep(self):
+        while not self._stopped.wait(self.sweep_s):
+            try:
+                for job_id in self.reclaim():
+                    print(f"Job {job_id}: no heartbeat for {self.lease_s}s, requeued")
+                    self.submit(job_id)
+            except Exception as e:
+                print(f"Job sweep failed: {e}")
+
+    def _claim(self, session, job_id):
+        """
+        queued -> running, atomically. Returns the claim's started_at, which identifies
+        this run of the job, or None if another thread/process got there first.
+        """
+        now = utcnow()
+        claimed = session.exec(
+            update(AssessmentJob)
+            .where(AssessmentJob.id == job_id, AssessmentJob.status == "queued")
+            .values(status="running", started_at=now, heartbeat_at=now, rows_done=0, error=None)
+        ).rowcount == 1
+        session.commit()
+        return now if claimed else None
+
+    def _update_claimed(self, session, job_id, claimed_at, **values):
+        """
+        Heartbeat + `values` on the job row, if this run still holds it. False when the
+        job was requeued meanwhile (this worker looked dead) and maybe claimed again.
+        """
+        held = session.exec(
+            update(AssessmentJob)
+            .where(AssessmentJob.id == job_id, AssessmentJob.status == "running",
+                   AssessmentJob.started_at == claimed_at)
+            .values(heartbeat_at=utcnow(), **values)
+        ).rowcount == 1
+        session.commit()
+        return held
+
+    def run(self, job_id):
+        from src.api.context import current_context
+        from src.scoring import bulk
+
+        with Session(database.engine) as session:
+            claimed_at = self._claim(session, job_id)
+            if claimed_at is None:
+                return
+            job = session.get(AssessmentJob, job_id)
+            source = input_path(job.id, job.filename)
+            # One partial file per run: a run that lost its claim never writes into its successor's
+            partial = f"{result_path(job.id)}.{uuid.uuid4().hex[:8]}.partial"
+            writer = bulk.ChunkWriter(partial)
+            try:
+                ctx = current_context()
+                if ctx is None:
+                    raise RuntimeError("Models are not loaded")
+                # One scorer for the whole file, even if models are reloaded meanwhile
+                scorer = ctx.scorer
+                if not self._update_claimed(session, job_id, claimed_at, rows_total=bulk.count_rows(source)):
+                    raise ClaimLost()
+
+                for chunk in bulk.read_chunks(source, self.chunk_size):
+                    writer.write(bulk.score_frame(scorer, chunk))
+                    if not self._update_claimed(session, job_id, claimed_at, rows_done=writer.rows):
+                        raise ClaimLost()
+                writer.close()
+
+                if not self._update_claimed(session, job_id, claimed_at):
+                    raise ClaimLost()
+                os.replace(partial, result_path(job.id))
+                self._update_claimed(session, job_id, claimed_at, status="done", rows_total=writer.rows,
+                                     finished_at=utcnow())
+            except ClaimLost:
+                # Requeued while still running here: the new run owns the row, the upload and the result
+                writer.close()
+                if os.path.exists(partial):
+                    os.remove(partial)
+                print(f"Job {job_id} was requeued while running in this process; stopped")
+                return
+            except Exception as e:
+                writer.close()
+                if os.path.exists(partial):
+                    os.remove(partial)
+                print(f"Job {job_id} failed: {e}")
+                traceback.print_exc()
+                if not self._update_claimed(session, job_id, claimed_at, status="failed", error=str(e),
+                                            finished_at=utcnow()):
+                    return
+            # Done or failed: the upload isn't needed any more (a failed job is resubmitted as a new upload)
+            if os.path.exists(source):
+                os.remove(source)
+
+    def shutdown(self, wait=True):
+        self._stopped.set()
+        with self._lock:
+            self._sweeper = None
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+
+runner = JobRunner(settings.JOB_WORKERS, settings.JOB_CHUNK_SIZE, settings.JOB_LEASE_S)
@@ -1,21 +1,36 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import Session
-import joblib
-import pandas as pd
-import numpy as np
-import os
+from starlette.concurrency import run_in_threadpool
+from sqlmodel import Session, func
+import gc
 import json
+import os
+import random
+from typing import Optional
 from src.config import settings
+from src.db import database
 from src.db.database import create_db_and_tables, get_session
 from src.models.user_model import User
 from src.models.prediction_model import Prediction
-from src.auth.security import get_current_user
+from src.auth.security import get_current_user, require_admin
 from src.api import auth_routes
-from src.api.schemas import PatientData, AssessmentResponse
-from src.utils.live_data import LiveDataClient
-from src.utils.bayesian_network import EnvironmentalBayesNet
-from src.utils.recommender import HeartRecommender
+from src.api import job_routes
+from src.api import jobs
+from src.api.schemas import PatientData, AssessmentResponse, risk_category_of
+from src.api import warmup
+from src.api import result_cache
+from src.api import admission
+from src.api.metrics import (
+    ASSESS_ADMISSIONS, ASSESS_STAGE_SECONDS, CASCADE_AUDITS, CASCADE_DECISIONS, OPENWEATHER_CIRCUIT,
+    StageTimer, render_metrics
+)
+from src.api.profiling import Profiler, track_allocations
+from src.utils import gazetteer, tracing
+from src.api.context import (
+    InferenceContext, build_inference_context, current_context,
+    get_inference_context, set_inference_context
+)
 
 # Initialize App
 app = FastAPI(
@@ -33,53 +48,199 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global Variables
-system = {
-    "clf": None,      # Classifier (XGBoost)
-    "reg": None,      # Regressor (Random Forest)
-    "scaler": None,   # Feature Scaler
-    "cols": None,     # Column names
-    "sensor": None,   # IoT Client
-    "brain": None,    # Bayesian Network
-    "advisor": None   # Recommender
-}
+# Tracing (off unless TRACE_EXPORTER is set): one server span per request,
+# with auth, OpenWeather and SQL spans underneath
+if tracing.setup_tracing(settings.TRACE_EXPORTER, settings.TRACE_SAMPLE_RATIO, settings.TRACE_FILE):
+    app.add_middleware(tracing.TracingMiddleware)
+    print(f"Tracing on: {settings.TRACE_EXPORTER} exporter, sample ratio {settings.TRACE_SAMPLE_RATIO}")
 
-# --- 1. STARTUP EVENT (DB + MODELS) ---
-@app.on_event("startup")
-def on_startup():
-    print("Starting up Cardiac System...")
-    
-    # A. Create Database Tables
-    create_db_and_tables()
-    print("Database tables created (heart_app.db)")
-    
-    # B. Load ML Artifacts
+# Opt-in stack sampling of /assess (PROFILE_REQUESTS or an admin's X-Profile header)
+profiler = Profiler(settings.PROFILE_REQUESTS, settings.PROFILE_INTERVAL_MS,
+                    settings.PROFILE_DIR, settings.PROFILE_TRACEMALLOC)
+
+def _openweather_circuit_state():
+    ctx = current_context()
+    breaker = getattr(ctx.sensor, "breaker", None) if ctx is not None else None
+    return breaker.state_value() if breaker is not None else 0
+
+OPENWEATHER_CIRCUIT.set_function(_openweather_circuit_state)
+
+# Models + logic layers live in an immutable InferenceContext (src/api/context.py)
+def load_system():
+    """Builds, warms up and publishes the inference context. Returns it, or None on failure."""
+    # B. Load ML Artifacts + Logic Layers
     try:
-        system['clf'] = joblib.load(os.path.join(settings.MODEL_PATH, "model_classification.pkl"))
-        system['reg'] = joblib.load(os.path.join(settings.MODEL_PATH, "model_regression.pkl"))
-        system['cols'] = joblib.load(os.path.join(settings.MODEL_PATH, "model_columns.pkl"))
-        system['scaler'] = joblib.load(os.path.join(settings.MODEL_PATH, "model_scaler.pkl"))
-        print(" ML Models & Scaler Loaded")
+        context = build_inference_context(
+            settings.MODEL_PATH, settings.SCORING_BACKEND, settings.CASCADE,
+            settings.SHADOW_MODEL_PATH, settings.SHADOW_BACKEND,
+            settings.SHADOW_QUEUE_SIZE, settings.SHADOW_WINDOW, settings.SHADOW_MAX_DUTY
+        )
+        print(f" ML Models & Scaler Loaded ({context.backend})")
+        if context.screen is not None:
+            print(f" Cascade on: screening band +/-{context.screen.band:.3f}")
+        if context.shadow is not None:
+            print(f" Shadow scoring on: candidate {context.shadow.version} from {settings.SHADOW_MODEL_PATH}")
+        previous = current_context()
+        if previous is not None:
+            # Circuit state and last good observations are about OpenWeather, not the models: keep them
+            context = context.replace(sensor=previous.sensor)
+        print(" IoT & Logic Engines Ready")
     except Exception as e:
         print(f" CRITICAL ERROR: Could not load models. {e}")
+        return None
+
+    # C. Warm-up: pay lazy init (imports, first DB connection, ...) before the first patient
+    if settings.WARMUP_ROUNDS > 0:
+        patients = warmup.load_patients(settings.WARMUP_PATIENTS_FILE)
+        report = warmup.run_warmup(context, settings.WARMUP_ROUNDS, patients)
+        context = context.replace(startup_report=report)
+        cold, warm = report['cold_ms'] or {}, report['warm_ms'] or {}
+        print(f" Warm-up done in {report['duration_ms']}ms "
+              f"(cold {cold.get('total')}ms, warm {warm.get('total')}ms, {len(report['errors'])} errors)")
+
+    # D. Publish (atomic swap; /ready passes from here on)
+    set_inference_context(context)
+    return context
+
+def preload_system():
+    """
+    Multi-worker mode: gunicorn calls this once in the master before forking
+    (see gunicorn.conf.py), so every worker shares the loaded models copy-on-write.
+    """
+    print("Preloading Cardiac System in the master process...")
+    create_db_and_tables()
+    load_system()
+
+    # Never hand pooled DB connections over to forked workers
+    database.engine.dispose()
+    # Move everything loaded so far out of the GC's reach, so collections
+    # in the workers don't touch (and copy) the shared pages
+    gc.freeze()
+
+# --- 1. STARTUP EVENT (DB + MODELS) ---
+@app.on_event("startup")
+def on_startup():
+    if current_context() is not None:
+        print(f"Worker {os.getpid()}: using models preloaded by the master")
+        # The master's DB pool was disposed before forking; open this worker's own
+        warmup.touch_database()
+    else:
+        print("Starting up Cardiac System...")
+
+        # A. Create Database Tables
+        create_db_and_tables()
+        print("Database tables created")
 
-    # C. Initialize Logic Layers
-    system['sensor'] = LiveDataClient()
-    system['brain'] = EnvironmentalBayesNet()
-    system['advisor'] = HeartRecommender()
-    print(" IoT & Logic Engines Ready")
+        load_system()
 
-# --- 2. INCLUDE AUTH ROUTES ---
+    # B. Pick up assessment jobs left queued (or orphaned) by a previous run
+    resumed = jobs.runner.resume()
+    if resumed:
+        print(f"Resumed {len(resumed)} assessment job(s)")
+
+@app.on_event("shutdown")
+def on_shutdown():
+    # Unfinished jobs keep their row and are resumed by the next start
+    jobs.runner.shutdown(wait=False)
+
+# --- 2. INCLUDE AUTH + JOB ROUTES ---
 app.include_router(auth_routes.router)
+app.include_router(job_routes.router)
+
+# Per-stage timing for /assess. FastAPI caches dependencies per request,
+# so the endpoint and timed_current_user share one StageTimer.
+def start_timer():
+    return StageTimer()
+
+def timed_current_user(
+    timer: StageTimer = Depends(start_timer),
+    user: User = Depends(get_current_user)
+):
+    """get_current_user (JWT decode + user lookup), timed as the "auth" stage"""
+    timer.lap("auth")
+    return user
+
+async def request_profile(
+    request: Request,
+    user: User = Depends(timed_current_user),
+    timer: StageTimer = Depends(start_timer)
+):
+    """
+    Profiles this request when asked to, else yields None. Async on purpose: it runs
+    on the event loop thread, which is the thread that runs the /assess body.
+    """
+    if not profiler.wanted(request, user):
+        yield None
+        return
+    profile = profiler.start()
+    try:
+        yield profile
+    finally:
+        profiler.stop(profile, timer.stages)
+
+async def admit_assessment(authorization: Optional[str] = Header(None)):
+    """
+    Holds an /assess concurrency slot for the rest of the request, or fails fast
+    with 503 + Retry-After. Runs first, before auth. Only once the ordinary slots
+    are full is the caller's token checked for the high-risk priority reserve.
+    """
+    if not settings.ADMISSION_CONTROL:
+        yield
+        return
+    limiter = admission.limiter
+    started = limiter.try_acquire()
+    result = "admitted"
+    if started is None and await run_in_threadpool(
+        admission.is_priority, authorization, settings.ADMISSION_PRIORITY_WINDOW_S
+    ):
+        started = limiter.try_acquire(priority=True)
+        result = "priority"
+    if started is None:
+        ASSESS_ADMISSIONS.inc("shed")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many assessments in progress, please retry shortly",
+            headers={"Retry-After": str(limiter.retry_after_s())}
+        )
+    ASSESS_ADMISSIONS.inc(result)
+    try:
+        yield
+    finally:
+        limiter.release(started)
+
+def canonical_city(city):
+    """
+    The gazetteer label for `city`. A city it doesn't know goes through as typed (the
+    weather only shifts the score; live data falls back to defaults), unless
+    CITY_VALIDATION=reject, where it's a 422 naming the closest ones it does know.
+    """
+    if settings.CITY_VALIDATION == "off":
+        return city
+    places = gazetteer.default(settings.GAZETTEER_PATH)
+    place = places.resolve(city)
+    if place is None:
+        if settings.CITY_VALIDATION != "reject":
+            return city
+        suggestions = [p.label for p in places.suggest(city)]
+        hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else " Pick one from /cities."
+        raise HTTPException(status_code=422, detail=f"Unknown city '{city.strip()}'.{hint}")
+    return place.label
 
 # --- 3. THE SMART ENDPOINT (NOW SECURE) ---
 @app.post("/assess", response_model=AssessmentResponse)
 async def assess_patient(
     patient: PatientData, 
+    response: Response,
+    # Adaptive concurrency limit: sheds with 503 before auth, models or network
+    _admission = Depends(admit_assessment),
     # This forces the user to be logged in
-    current_user: User = Depends(get_current_user), 
+    current_user: User = Depends(timed_current_user), 
     # This gives us access to the database
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    # Models + logic layers, validated once at load time
+    ctx: InferenceContext = Depends(get_inference_context),
+    timer: StageTimer = Depends(start_timer),
+    profile = Depends(request_profile)
 ):
     """
     Diagnostic Endpoint: 
@@ -91,46 +252,104 @@ async def assess_patient(
     
     # --- A. PREPARE DATA ---
     input_dict = json.loads(patient.json())
-    city = input_dict.pop("city") 
+    # "london, uk" -> "London, GB", before any model or network call
+    city = canonical_city(input_dict.pop("city"))
+    timer.lap("validate")
     
-    # DataFrame Conversion
-    df = pd.DataFrame([input_dict])
-    cat_cols = ['cp', 'restecg', 'slope', 'thal']
-    df = pd.get_dummies(df, columns=cat_cols)
-    df = df.reindex(columns=system['cols'], fill_value=0)
-    
-    # Scaling
-    num_cols = ['age', 'trestbps', 'chol', 'thalach', 'oldpeak']
-    df[num_cols] = system['scaler'].transform(df[num_cols])
-
     # --- B. EXECUTE AI (Layer 1) ---
-    prob_disease = system['clf'].predict_proba(df)[0][1]
-    severity_raw = system['reg'].predict(df)[0]
-    base_risk = (prob_disease * 0.6) + ((severity_raw / 4.0) * 0.4)
+    # Encoding (one-hot + scaling) happens inside the scorer
+    with track_allocations(profile, "encode"):
+        X = ctx.scorer.encode_patient(input_dict)
+    model_key = (ctx.scorer.version, result_cache.feature_key(X))
+    timer.lap("encode")
+    # Same encoded patient on the same models -> same outputs, skip inference
+    outputs = result_cache.MODEL_OUTPUTS.get(model_key)
+    screen_risk = None
+    if outputs is None:
+        if ctx.screen is not None:
+            # Cascade: the full ensemble waits until we know whether it's needed (D. below)
+            screen_risk = ctx.screen.score_encoded(X)
+        else:
+            outputs = ctx.scorer.score_encoded(X)
+            result_cache.MODEL_OUTPUTS.put(model_key, outputs)
+    timer.lap("predict")
 
     # --- C. LIVE CONTEXT (Layer 2) ---
-    env_data = system['sensor'].get_data(city)
-    env_stress = 0.0
-    if env_data['success']:
-        bayes_res = system['brain'].infer_stress_probability(
-            env_data['temp'], env_data['aqi']
+    # Blocking HTTP: run it on the threadpool so the event loop keeps serving (and
+    # admitting or shedding) other requests while OpenWeather answers. A profiled
+    # request has the threadpool thread sampled for it during the call
+    env_data = await run_in_threadpool(profiler.call, profile, ctx.sensor.get_data, city)
+    timer.lap("live_data")
+
+    # Same patient, city and weather observation -> the same result as last time
+    screen_version = ctx.screen.version if ctx.screen is not None else None
+    response_key = model_key + (screen_version, city, env_data.get('fetched_at'))
+    cached = result_cache.RESPONSES.get(response_key)
+    if cached is not None:
+        result, total_risk, risk_category = cached
+        timer.lap("bayes")
+        timer.lap("escalate")
+        timer.lap("recommend")
+    else:
+        env_stress = 0.0
+        if env_data['success']:
+            bayes_res = ctx.brain.infer_stress_probability(
+                env_data['temp'], env_data['aqi']
+            )
+            env_stress = bayes_res['p_stress']
+        timer.lap("bayes")
+
+        # --- D. FUSION (Layer 3) ---
+        env_shift = env_stress * 0.15
+        # Cascade: the screen's score stands if it's clear of every threshold,
+        # otherwise the full ensemble decides
+        if screen_risk is not None and ctx.screen.decides(min(screen_risk + env_shift, 1.0)):
+            CASCADE_DECISIONS.inc("screened")
+            base_risk = screen_risk
+            if random.random() < settings.CASCADE_AUDIT_RATE:
+                full_risk = ctx.scorer.base_risk(*ctx.scorer.score_encoded(X))
+                agreed = risk_category_of(min(full_risk + env_shift, 1.0)) == risk_category_of(min(base_risk + env_shift, 1.0))
+                CASCADE_AUDITS.inc("agree" if agreed else "disagree")
+        else:
+            if outputs is None:
+                outputs = ctx.scorer.score_encoded(X)
+                result_cache.MODEL_OUTPUTS.put(model_key, outputs)
+            if screen_risk is not None:
+                CASCADE_DECISIONS.inc("escalated")
+            base_risk = ctx.scorer.base_risk(*outputs)
+        timer.lap("escalate")
+
+        # Shadow: the candidate scores the same patient on its own thread (never blocks)
+        if ctx.shadow is not None:
+            live_seconds = sum(seconds for stage, seconds in timer.stages if stage in ("predict", "escalate"))
+            ctx.shadow.submit(X, input_dict, base_risk, env_shift, live_seconds)
+
+        total_risk = min(base_risk + env_shift, 1.0)
+
+        risk_category = risk_category_of(total_risk)
+
+        # Get Advice
+        advice = ctx.advisor.get_recommendations(
+            risk_score=total_risk,
+            weather_data={"temp": env_data.get('temp', 0)},
+            pollution_data={"aqi": env_data.get('aqi', 0)},
+            patient_data=input_dict
         )
-        env_stress = bayes_res['p_stress']
-    
-    # --- D. FUSION (Layer 3) ---
-    total_risk = min(base_risk + (env_stress * 0.15), 1.0)
-    
-    risk_category = "High Risk" if total_risk > 0.7 else "Moderate" if total_risk > 0.3 else "Low"
-    
-    # Get Advice
-    advice = system['advisor'].get_recommendations(
-        risk_score=total_risk,
-        weather_data={"temp": env_data.get('temp', 0)},
-        pollution_data={"aqi": env_data.get('aqi', 0)},
-        patient_data=input_dict
-    )
+        result = {
+            "risk_score": round(total_risk * 100, 2),
+            "risk_category": risk_category,
+            "environment": {
+                "city": city,
+                "temp": env_data.get('temp'),
+                "aqi": env_data.get('aqi'),
+                "stress_factor": round(env_stress * 100, 1)
+            },
+            "recommendations": advice['recommendations']
+        }
+        result_cache.RESPONSES.put(response_key, (result, total_risk, risk_category))
+        timer.lap("recommend")
 
-    #E. SAVE TO DATABASE
+    #E. SAVE TO DATABASE (cached or not, every assessment is part of the history)
     # We create a new row in the 'prediction' table
     history_entry = Prediction(
         user_id=current_user.id,  # Link to the logged-in user
@@ -149,30 +368,29 @@ async def assess_patient(
     
     session.add(history_entry)
     session.commit() # Save it!
+    timer.lap("db")
+
+    timer.finish(ASSESS_STAGE_SECONDS)
+    if settings.SERVER_TIMING:
+        response.headers["Server-Timing"] = timer.server_timing()
     
     # --- F. RETURN RESPONSE ---
-    return {
-        "risk_score": round(total_risk * 100, 2),
-        "risk_category": risk_category,
-        "environment": {
-            "city": city,
-            "temp": env_data.get('temp'),
-            "aqi": env_data.get('aqi'),
-            "stress_factor": round(env_stress * 100, 1)
-        },
-        "recommendations": advice['recommendations']
-    }
+    return result
 
 # --- 4. HISTORY ENDPOINT ---
 @app.get("/history")
 async def get_history(
+    limit: int = Query(10, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    """Get user's assessment history"""
-    predictions = session.query(Prediction).filter(
-        Prediction.user_id == current_user.id
-    ).order_by(Prediction.timestamp.desc()).limit(10).all()
+    """Get one page of the user's assessment history (newest first)"""
+    mine = Prediction.user_id == current_user.id
+    total = session.query(func.count(Prediction.id)).filter(mine).scalar()
+    predictions = session.query(Prediction).filter(mine).order_by(
+        Prediction.timestamp.desc(), Prediction.id.desc()
+    ).offset(offset).limit(limit).all()
     
     history = []
     for p in predictions:
@@ -187,8 +405,62 @@ async def get_history(
             "thalach": p.thalach
         })
     
-    return {"history": history, "count": len(history)}
+    return {"history": history, "count": len(history), "total": total, "offset": offset}
 
 @app.get("/")
 def health_check():
-    return {"status": "online", "db": "connected", "auth": "active"}
\ No newline at end of file
+    return {"status": "online", "db": "connected", "auth": "active"}
+
+@app.get("/cities")
+def search_cities(prefix: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=50)):
+    """City autocomplete from the offline gazetteer: every label returned is accepted by /assess."""
+    places = gazetteer.default(settings.GAZETTEER_PATH).complete(prefix, limit)
+    return {"cities": [
+        {"label": p.label, "name": p.name, "country": p.country, "country_code": p.country_code,
+         "lat": p.lat, "lon": p.lon}
+        for p in places
+    ]}
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: only passes once the models are loaded and warm in this worker."""
+    ctx = get_inference_context()
+    return {"status": "ready", "backend": ctx.backend, "pid": os.getpid()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint: per-stage /assess latency histograms (this worker)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/startup-report")
+def startup_report():
+    """Cold (first pass) vs warm latency per pipeline stage, measured during warm-up."""
+    ctx = current_context()
+    return {"ready": ctx is not None, "warmup": ctx.startup_report if ctx else None}
+
+@app.get("/admin/profile", response_class=PlainTextResponse)
+def profile_stacks(reset: bool = False, current_user: User = Depends(require_admin)):
+    """
+    Collapsed stacks sampled from profiled /assess requests in this worker
+    (input for flamegraph.pl or speedscope). Admins only.
+    """
+    stacks = profiler.collapsed()
+    if reset:
+        profiler.sampler.reset()
+    return PlainTextResponse(stacks)
+
+@app.get("/admin/shadow")
+def shadow_stats(current_user: User = Depends(require_admin)):
+    """Shadow candidate vs live models over the last comparisons in this worker. Admins only."""
+    ctx = current_context()
+    if ctx is None or ctx.shadow is None:
+        return {"enabled": False}
+    return {"enabled": True, **ctx.shadow.stats()}
+
+@app.post("/admin/reload-models")
+def reload_models(current_user: User = Depends(require_admin)):
+    """Rebuilds + warms a fresh context from disk and swaps it in. Admins only."""
+    ctx = load_system()
+    if ctx is None:
+        raise HTTPException(status_code=500, detail="Reload failed; still serving the previous models")
+    return {"status": "reloaded", "backend": ctx.backend}
\ No newline at end of file
@@ -0,0 +1,259 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from time import perf_counter
+
+# Stages of /assess, in the order they run (see assess_patient in src/api/main.py)
+# "predict" runs the screening model when the cascade is on; "escalate" the full ensemble if it's still needed
+ASSESS_STAGES = ["auth", "validate", "encode", "predict", "live_data", "bayes", "escalate", "recommend", "db"]
+
+# Seconds. Scoring stages sit in the sub-millisecond buckets, OpenWeather in the top ones
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Minimal Prometheus histogram with one label.
+    The request path only appends a list of (label, seconds) to a deque (atomic, no lock).
+    A background thread moves the queue into the buckets every `fold_interval_s`, and
+    so does every scrape: no request ever pays for bucketing, and nothing is dropped.
+    (Per process: with several gunicorn workers each one exposes its own counts.)
+    """
+
+    def __init__(self, name, documentation, label, buckets=DEFAULT_BUCKETS, fold_interval_s=1.0):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = tuple(buckets)
+        self.fold_interval_s = fold_interval_s
+        self._series = {}
+        self._pending = deque()
+        self._folder = None
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def record(self, observations):
+        """Queues a batch of (label_value, seconds) pairs. Hot path: O(1)."""
+        self._pending.append(observations)
+        if self._folder is None:
+            self._start_folder()
+
+    def observe(self, label_value, seconds):
+        self.record(((label_value, seconds),))
+
+    def _start_folder(self):
+        with self._lock:
+            if self._folder is None:
+                self._folder = threading.Thread(target=self._fold_periodically, name=f"{self.name}-fold",
+                                                 daemon=True)
+                self._folder.start()
+
+    def _fold_periodically(self):
+        while True:
+            time.sleep(self.fold_interval_s)
+            self._fold()
+
+    def _after_fork(self):
+        # Threads don't survive a fork (gunicorn workers): the child starts its own
+        # folder on its first record(). The lock may have been held at fork time
+        self._folder = None
+        self._lock = threading.Lock()
+
+    def _fold(self):
+        """Moves queued observations into the buckets."""
+        buckets, pending = self.buckets, self._pending
+        with self._lock:
+            while True:
+                try:
+                    observations = pending.popleft()
+                except IndexError:
+                    break
+                for label_value, seconds in observations:
+                    series = self._series.get(label_value)
+                    if series is None:
+                        # [per-bucket counts (last one is +Inf), sum]
+                        series = self._series[label_value] = [[0] * (len(buckets) + 1), 0.0]
+                    series[0][bisect_left(buckets, seconds)] += 1
+                    series[1] += seconds
+
+    def snapshot(self):
+        self._fold()
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for value, (counts, total) in sorted(self.snapshot().items()):
+            label = f'{self.label}="{value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total!r}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter:
+    """Minimal Prometheus counter with a fixed set of labels."""
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, count in values:
+            labels = ",".join(f'{label}="{value}"' for label, value in zip(self.labels, label_values))
+            lines.append(f"{self.name}{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class Gauge:
+    """Minimal Prometheus gauge whose value is read from a function at scrape time."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._read = None
+
+    def set_function(self, read):
+        self._read = read
+
+    def value(self):
+        return self._read() if self._read is not None else 0
+
+    def render(self):
+        return (f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} gauge\n"
+                f"{self.name} {self.value()!r}\n")
+
+
+class StageTimer:
+    """
+    Lap timer for one request: lap(stage) closes the stage that just ran.
+    One perf_counter() call per stage, nothing else until finish().
+    """
+    __slots__ = ("started", "stages", "_last")
+
+    def __init__(self):
+        self.started = self._last = perf_counter()
+        self.stages = []
+
+    def lap(self, stage):
+        now = perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    def finish(self, histogram):
+        """Adds the "total" stage and records every stage in `histogram`. Call once, after the last lap."""
+        self.stages.append(("total", self._last - self.started))
+        histogram.record(self.stages)
+
+    def server_timing(self):
+        """Server-Timing header value, durations in milliseconds."""
+        return ", ".join(["%s;dur=%.3f" % (stage, seconds * 1e3) for stage, seconds in self.stages])
+
+
+ASSESS_STAGE_SECONDS = Histogram(
+    "cardioguard_assess_stage_seconds",
+    "Time spent in each stage of POST /assess (stage=\"total\" for the whole request)",
+    "stage",
+)
+
+ASSESS_CACHE_LOOKUPS = Counter(
+    "cardioguard_assess_cache_lookups_total",
+    "Result cache lookups in POST /assess, by cache and hit/miss",
+    ("cache", "result"),
+)
+
+CASCADE_DECISIONS = Counter(
+    "cardioguard_cascade_decisions_total",
+    "POST /assess risk scores decided by the screening model alone vs escalated to the full ensemble",
+    ("path",),
+)
+
+CASCADE_AUDITS = Counter(
+    "cardioguard_cascade_audits_total",
+    "Screened /assess requests re-scored by the full ensemble, by whether the risk category agreed",
+    ("result",),
+)
+
+SHADOW_SUBMISSIONS = Counter(
+    "cardioguard_shadow_submissions_total",
+    "Patients handed to the shadow candidate: queued, dropped (queue full) or failed to score",
+    ("result",),
+)
+
+SHADOW_COMPARISONS = Counter(
+    "cardioguard_shadow_comparisons_total",
+    "Shadow candidate vs live model, by whether the risk category agreed",
+    ("result",),
+)
+
+SHADOW_SCORE_SECONDS = Histogram(
+    "cardioguard_shadow_score_seconds",
+    "Model time per patient: the live predict + escalate stages vs the shadow candidate",
+    "model",
+)
+
+ASSESS_CONCURRENCY_LIMIT = Gauge(
+    "cardioguard_assess_concurrency_limit",
+    "Current adaptive limit on concurrent POST /assess requests (src/api/admission.py)",
+)
+
+ASSESS_IN_FLIGHT = Gauge(
+    "cardioguard_assess_in_flight",
+    "POST /assess requests holding a concurrency slot right now",
+)
+
+ASSESS_ADMISSIONS = Counter(
+    "cardioguard_assess_admissions_total",
+    "POST /assess admission decisions: admitted, admitted from the priority reserve, or shed with 503",
+    ("result",),
+)
+
+LIVE_DATA_SOURCES = Counter(
+    "cardioguard_live_data_total",
+    "Environmental data for /assess: live from OpenWeather, cached (this worker's recent fetch for the area), "
+    "shared (another worker's), "
+    "the city's last known good observation, or defaults",
+    ("source",),
+)
+
+OPENWEATHER_HEDGES = Counter(
+    "cardioguard_openweather_hedges_total",
+    "Second OpenWeather requests sent after the first ran past its p95, by whether the second answered first",
+    ("result",),
+)
+
+OPENWEATHER_CIRCUIT = Gauge(
+    "cardioguard_openweather_circuit_state",
+    "OpenWeather circuit breaker: 0 closed, 1 half-open (probing), 2 open",
+)
+
+REGISTRY = [ASSESS_STAGE_SECONDS, ASSESS_CACHE_LOOKUPS, CASCADE_DECISIONS, CASCADE_AUDITS,
+            SHADOW_SUBMISSIONS, SHADOW_COMPARISONS, SHADOW_SCORE_SECONDS,
+            ASSESS_CONCURRENCY_LIMIT, ASSESS_IN_FLIGHT, ASSESS_ADMISSIONS,
+            LIVE_DATA_SOURCES, OPENWEATHER_HEDGES, OPENWEATHER_CIRCUIT]
+
+
+def render_metrics():
+    return "".join(metric.render() for metric in REGISTRY)
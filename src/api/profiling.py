@@ -0,0 +1,235 @@
+"""
+Opt-in profiling of live /assess traffic.
+
+A request is profiled when PROFILE_REQUESTS=true, or when an admin sends
+"X-Profile: 1". While it runs, a sampler thread snapshots its stack every
+PROFILE_INTERVAL_MS with sys._current_frames() and counts collapsed stacks.
+The counts go to PROFILE_DIR/assess.<pid>.collapsed, which feeds straight into
+flamegraph.pl or speedscope. One JSON line per profiled request in
+PROFILE_DIR/assess.<pid>.jsonl holds its stage timings, sample count and
+allocations during encoding: net allocated blocks (sys.getallocatedblocks), plus
+peak bytes when PROFILE_TRACEMALLOC=true. tracemalloc slows every allocation in
+the process several times over, so it's off unless asked for.
+
+Concurrent /assess requests share the event loop thread. Each request registers
+it with its task's coroutine frame, and a sample is charged to a request only when
+that frame is on the stack: while the request is parked in an await, whatever
+else the loop runs isn't counted for it.
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+
+class StackSampler:
+    """Samples the stacks of registered threads from a background thread.
+
+    A thread can be registered several times (one per request on it); it is sampled
+    until the last registration is removed.
+    """
+
+    def __init__(self, interval_s=0.005, flush_path=None, flush_every_s=10.0):
+        self.interval_s = interval_s
+        self.flush_path = flush_path
+        self.flush_every_s = flush_every_s
+        self.counts = Counter()
+        self._threads = {}  # thread ident -> {owner: [frame or None, samples charged to owner]}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._dirty = False
+
+    def add(self, ident, owner=None, frame=None):
+        """
+        Samples thread `ident` for `owner` (default: the thread itself). With `frame`,
+        only samples that have it on the stack count (see the module docstring).
+        """
+        with self._cond:
+            self._threads.setdefault(ident, {})[ident if owner is None else owner] = [frame, 0]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def remove(self, ident, owner=None):
+        """Ends `owner`'s registration of `ident`; returns how many samples were charged to it."""
+        with self._cond:
+            owners = self._threads.get(ident, {})
+            registration = owners.pop(ident if owner is None else owner, None)
+            if not owners:
+                self._threads.pop(ident, None)
+            return registration[1] if registration is not None else 0
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            with self._cond:
+                if not self._threads:
+                    # Idle: nothing to sample, wake up now and then to flush
+                    self._cond.wait(timeout=self.flush_every_s)
+                busy = bool(self._threads)
+            if busy:
+                time.sleep(self.interval_s)
+                self.sample()
+            if self._dirty and time.monotonic() - last_flush >= self.flush_every_s:
+                self.flush()
+                last_flush = time.monotonic()
+
+    def sample(self):
+        frames = sys._current_frames()
+        with self._cond:
+            for ident, owners in self._threads.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack, on_stack = [], set()
+                while frame is not None:
+                    on_stack.add(frame)
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                charged = [entry for entry in owners.values() if entry[0] is None or entry[0] in on_stack]
+                if not charged:
+                    # e.g. the event loop idle, or running a request that isn't profiled
+                    continue
+                self.counts[";".join(reversed(stack))] += 1
+                for entry in charged:
+                    entry[1] += 1
+            self._dirty = True
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed format: "root;caller;leaf count" per line."""
+        with self._cond:
+            return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def flush(self):
+        if not self.flush_path or not self._dirty:
+            return
+        text = self.collapsed()
+        tmp_path = f"{self.flush_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.flush_path)
+        self._dirty = False
+
+    def reset(self):
+        with self._cond:
+            self.counts.clear()
+            self._dirty = True
+
+
+class RequestProfile:
+    """State of one profiled request."""
+    __slots__ = ("ident", "frame", "started", "allocations", "samples")
+
+    def __init__(self, ident, frame=None):
+        self.ident = ident
+        self.frame = frame
+        self.started = time.time()
+        self.allocations = {}
+        self.samples = 0
+
+
+def _task_frame():
+    # The running task's outermost coroutine frame: on the loop thread's stack only while it runs
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return None
+    return getattr(task.get_coro(), "cr_frame", None) if task is not None else None
+
+
+class Profiler:
+    def __init__(self, always=False, interval_ms=5.0, out_dir="profiles", use_tracemalloc=False):
+        self.always = always
+        self.use_tracemalloc = use_tracemalloc
+        self.out_dir = out_dir
+        self.sampler = StackSampler(interval_ms / 1e3)
+        self._tracemalloc_users = 0
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+
+    def path(self, extension):
+        # Resolved per call: gunicorn workers fork after this object is built
+        return os.path.join(self.out_dir, f"assess.{os.getpid()}.{extension}")
+
+    def wanted(self, request, user):
+        """PROFILE_REQUESTS=true profiles everything; otherwise only admins asking for it."""
+        if self.always:
+            return True
+        return request.headers.get("x-profile") == "1" and user.role == "admin"
+
+    def start(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.sampler.flush_path = self.path("collapsed")
+        with self._lock:
+            # Peak-memory tracking only while a profiled request is in flight
+            if self.use_tracemalloc and self._tracemalloc_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._tracemalloc_users += 1
+        profile = RequestProfile(threading.get_ident(), _task_frame())
+        self.sampler.add(profile.ident, profile, profile.frame)
+        return profile
+
+    def stop(self, profile, stages=()):
+        profile.samples += self.sampler.remove(profile.ident, profile)
+        with self._lock:
+            self._tracemalloc_users -= 1
+            # Leave it alone if someone else started it (e.g. PYTHONTRACEMALLOC=1)
+            if self._tracemalloc_users == 0 and self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+        record = {
+            "ts": round(profile.started, 3),
+            "samples": profile.samples,
+            "stages_ms": {stage: round(seconds * 1e3, 3) for stage, seconds in stages},
+            "allocations": profile.allocations,
+        }
+        with open(self.path("jsonl"), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+        return record
+
+    def call(self, profile, fn, *args):
+        """fn(*args), with this thread sampled for `profile` meanwhile (e.g. on the threadpool)."""
+        if profile is None:
+            return fn(*args)
+        ident = threading.get_ident()
+        self.sampler.add(ident, profile)
+        try:
+            return fn(*args)
+        finally:
+            profile.samples += self.sampler.remove(ident, profile)
+
+    def collapsed(self):
+        self.sampler.flush()
+        return self.sampler.collapsed()
+
+
+@contextmanager
+def _allocations(profile, stage):
+    # Blocks still allocated afterwards (net) + peak traced bytes during the stage
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+    start_blocks = sys.getallocatedblocks()
+    try:
+        yield
+    finally:
+        result = {"net_blocks": sys.getallocatedblocks() - start_blocks}
+        if tracing:
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1] - start_bytes
+        profile.allocations[stage] = result
+
+
+def track_allocations(profile, stage):
+    """Records allocations of the wrapped code in `profile` (no-op when not profiling)."""
+    if profile is None:
+        return nullcontext()
+    return _allocations(profile, stage)
@@ -0,0 +1,69 @@
+"""
+Caches for repeated identical assessments (double clicks, retries, kiosk re-checks).
+
+MODEL_OUTPUTS: (model version, feature hash) -> (prob_disease, severity_raw)
+RESPONSES:     (model version, feature hash, city, weather snapshot time) -> finished /assess result
+
+The feature hash is taken over the *encoded* vector, so inputs that encode the same
+(e.g. 1 vs 1.0) share an entry. Both caches are emptied whenever a new inference
+context is published (src/api/context.py). Keys carry the model version anyway, so a
+request still finishing on the old models can't leave an entry the new ones would hit.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.api.metrics import ASSESS_CACHE_LOOKUPS
+from src.config import settings
+
+
+class LRUCache:
+    """Bounded least-recently-used map. maxsize=0 disables it (get misses, put drops)."""
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        ASSESS_CACHE_LOOKUPS.inc(self.name, "miss" if value is None else "hit")
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def feature_key(X):
+    """Hash of an encoded feature matrix (NumPy array, DataFrame or list)."""
+    import numpy as np
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    digest = hashlib.blake2b(X.tobytes(), digest_size=16)
+    digest.update(repr(X.shape).encode())
+    return digest.hexdigest()
+
+
+MODEL_OUTPUTS = LRUCache("model_outputs", settings.RESULT_CACHE_SIZE)
+RESPONSES = LRUCache("responses", settings.RESPONSE_CACHE_SIZE)
+
+
+def clear():
+    MODEL_OUTPUTS.clear()
+    RESPONSES.clear()
@@ -68,6 +68,10 @@ class PatientData(BaseModel):
     # 3. Context (Manual Entry as requested)
     city: str = Field(..., example="London", description="Enter your city for live environmental analysis")
 
+def risk_category_of(total_risk):
+    """The risk_category /assess reports for a total risk in [0, 1]."""
+    return "High Risk" if total_risk > 0.7 else "Moderate" if total_risk > 0.3 else "Low"
+
 class AssessmentResponse(BaseModel):
     risk_score: float
     risk_category: str
@@ -0,0 +1,166 @@
+"""
+Shadow scoring: a candidate model bundle sees live /assess traffic without serving it.
+
+With SHADOW_MODEL_PATH set, /assess hands every freshly scored patient (encoded
+vector + what the live models answered) to ShadowRunner.submit(). That is one
+put_nowait() on a bounded queue: when the queue is full the patient is dropped
+and counted, the request never waits. A daemon thread scores the queue with the
+candidate and compares it with the live answer: risk category agreement, the
+absolute base_risk difference and model latency on both sides. The thread
+sleeps between patients so it never takes more than SHADOW_MAX_DUTY of a core away
+from live requests; when the candidate can't keep up, the queue fills and drops.
+
+The live encoding is reused when the candidate encodes a probe patient the same
+way; a candidate retrained with a different scaler or columns re-encodes the raw
+patient itself (on the shadow thread, still off the request path).
+
+Stats: counters and a latency histogram on /metrics, and a summary of the last
+SHADOW_WINDOW comparisons on GET /admin/shadow. Per process, like the rest of /metrics.
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from src.api.metrics import SHADOW_COMPARISONS, SHADOW_SCORE_SECONDS, SHADOW_SUBMISSIONS
+from src.api.schemas import risk_category_of
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ShadowRunner:
+    def __init__(self, candidate, live_scorer, maxsize=1024, window=10000, probe=None, max_duty=0.1):
+        self.candidate = candidate
+        self.max_duty = max_duty
+        self.version = candidate.version
+        self.queue = queue.Queue(maxsize)
+        self.window = deque(maxlen=window)  # (live_s, candidate_s, |delta|, agreed)
+        self.dropped = 0
+        self.failed = 0
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self.reuses_encoding = probe is not None and self._same_encoding(live_scorer, probe)
+
+    def _same_encoding(self, live_scorer, patient):
+        import numpy as np
+        if type(live_scorer) is not type(self.candidate):
+            # sklearn scores DataFrames, numeric plain arrays
+            return False
+        live = np.asarray(live_scorer.encode_patient(patient), dtype=np.float64)
+        mine = np.asarray(self.candidate.encode_patient(patient), dtype=np.float64)
+        # Also the candidate's first (cold) score, paid here rather than on live traffic
+        self.candidate.score_encoded(mine)
+        return live.shape == mine.shape and np.allclose(live, mine)
+
+    def _ensure_thread(self):
+        # Started on first use, and again in a forked gunicorn worker (threads don't survive a fork)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def submit(self, X, patient, live_base_risk, env_shift, live_seconds):
+        """Queues one scored patient for the candidate. Never blocks; False if dropped."""
+        if self._closed:
+            return False
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait((X, patient, live_base_risk, env_shift, live_seconds))
+        except queue.Full:
+            self.dropped += 1
+            SHADOW_SUBMISSIONS.inc("dropped")
+            return False
+        SHADOW_SUBMISSIONS.inc("queued")
+        return True
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None or self._closed:
+                self.queue.task_done()
+                return
+            t0 = time.perf_counter()
+            try:
+                self.score(*item)
+            except Exception as e:
+                self.failed += 1
+                SHADOW_SUBMISSIONS.inc("failed")
+                print(f"Shadow scoring failed: {e}")
+            finally:
+                self.queue.task_done()
+            # The candidate shares the CPU (and the GIL) with live requests: after each patient,
+            # rest so it gets at most max_duty of a core. The queue absorbs bursts, the rest is dropped.
+            busy = time.perf_counter() - t0
+            if self.max_duty < 1.0:
+                time.sleep(busy * (1.0 / self.max_duty - 1.0))
+
+    def score(self, X, patient, live_base_risk, env_shift, live_seconds):
+        t0 = time.perf_counter()
+        if not self.reuses_encoding:
+            X = self.candidate.encode_patient(patient)
+        base_risk = self.candidate.base_risk(*self.candidate.score_encoded(X))
+        seconds = time.perf_counter() - t0
+
+        agreed = (risk_category_of(min(base_risk + env_shift, 1.0))
+                  == risk_category_of(min(live_base_risk + env_shift, 1.0)))
+        SHADOW_COMPARISONS.inc("agree" if agreed else "disagree")
+        SHADOW_SCORE_SECONDS.record((("live", live_seconds), ("candidate", seconds)))
+        self.window.append((live_seconds, seconds, abs(base_risk - live_base_risk), agreed))
+
+    def stats(self):
+        """Summary of the last comparisons (latencies in ms)."""
+        window = list(self.window)
+        live_s = [w[0] for w in window]
+        candidate_s = [w[1] for w in window]
+        deltas = [w[2] for w in window]
+
+        def ms(values, q):
+            value = _percentile(values, q)
+            return None if value is None else round(value * 1e3, 3)
+
+        return {
+            "candidate_version": self.version,
+            "reuses_live_encoding": self.reuses_encoding,
+            "compared": len(window),
+            "queued": self.queue.qsize(),
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "category_agreement": round(sum(w[3] for w in window) / len(window), 4) if window else None,
+            "base_risk_delta": {
+                "mean": round(sum(deltas) / len(deltas), 4) if deltas else None,
+                "p99": _percentile(deltas, 0.99),
+                "max": max(deltas) if deltas else None,
+            },
+            "latency_ms": {
+                "live": {"p50": ms(live_s, 0.5), "p99": ms(live_s, 0.99)},
+                "candidate": {"p50": ms(candidate_s, 0.5), "p99": ms(candidate_s, 0.99)},
+            },
+        }
+
+    def close(self):
+        """Stops the thread (models were reloaded). Whatever is still queued is dropped."""
+        self._closed = True
+        try:
+            self.queue.put_nowait(None)  # wakes the thread if it's waiting on an empty queue
+        except queue.Full:
+            pass
+
+    def join(self, timeout=None):
+        """Waits until everything queued so far has been scored (tests, benchmarks)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.005)
+        return True
@@ -0,0 +1,42 @@
+"""
+Roles are granted on the server, never taken from the client: /register always
+creates a "user". An operator with access to the database makes someone an admin
+(the /admin/* endpoints, X-Profile) with:
+
+    python -m src.auth.roles alice admin
+"""
+import argparse
+
+from sqlmodel import Session
+
+from src.db import database
+from src.models.user_model import User
+
+ROLES = ("user", "admin")
+
+
+def set_role(username, role):
+    """Sets `username`'s role. False if there is no such user."""
+    if role not in ROLES:
+        raise ValueError(f"Unknown role: {role}")
+    with Session(database.engine) as session:
+        user = session.query(User).filter(User.username == username).first()
+        if user is None:
+            return False
+        user.role = role
+        session.commit()
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grant or revoke a user's role")
+    parser.add_argument("username")
+    parser.add_argument("role", choices=ROLES)
+    args = parser.parse_args()
+    if not set_role(args.username, args.role):
+        raise SystemExit(f"No user named {args.username}")
+    print(f"{args.username} is now {args.role}")
+
+
+if __name__ == "__main__":
+    main()
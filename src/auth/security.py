@@ -1,6 +1,5 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -8,6 +7,7 @@ from sqlmodel import Session
 from src.db.database import get_session
 from src.models.user_model import User
 from src.config import settings
+from src.utils import tracing
 import os
 from dotenv import load_dotenv
 
@@ -33,6 +33,8 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    # jose pulls in the cryptography backends; load it on first use, not at import
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -46,20 +48,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 # --- THE GATEKEEPER (Dependency) ---
 # This function is used in routes to say "Only logged in users allowed"
 def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)):
+    from jose import JWTError, jwt
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    with tracing.span("auth.get_current_user"):
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            username: str = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    user = session.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+
+        user = session.query(User).filter(User.username == username).first()
+        if user is None:
+            raise credentials_exception
+        return user
+
+def require_admin(current_user: User = Depends(get_current_user)):
+    """The logged-in user, if the database says they're an admin (the token's role claim isn't trusted)."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return current_user
\ No newline at end of file
@@ -22,6 +22,123 @@ class Config:
     # These will read from your .env file, or be empty strings if missing
     WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
     OPENAQ_API_KEY = os.getenv("OPENAQ_API_KEY", "")
+    # Point at benchmarks/fake_openweather.py for load tests without the real API
+    OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5")
+    # Guards on those calls (src/utils/resilience.py). Seconds to connect / to read the answer
+    OPENWEATHER_CONNECT_TIMEOUT_S = float(os.getenv("OPENWEATHER_CONNECT_TIMEOUT_S", "2"))
+    OPENWEATHER_READ_TIMEOUT_S = float(os.getenv("OPENWEATHER_READ_TIMEOUT_S", "3"))
+    # Consecutive failures that open the circuit, and how long until a probe is let through
+    OPENWEATHER_BREAKER_FAILURES = int(os.getenv("OPENWEATHER_BREAKER_FAILURES", "5"))
+    OPENWEATHER_BREAKER_RESET_S = float(os.getenv("OPENWEATHER_BREAKER_RESET_S", "30"))
+    # A call still unanswered at this quantile of recent calls gets a second (hedged) request
+    OPENWEATHER_HEDGE = os.getenv("OPENWEATHER_HEDGE", "true").lower() == "true"
+    OPENWEATHER_HEDGE_QUANTILE = float(os.getenv("OPENWEATHER_HEDGE_QUANTILE", "0.95"))
+    # Without a live answer a city's last good observation is used for this long, then defaults
+    LIVE_DATA_MAX_STALE_S = float(os.getenv("LIVE_DATA_MAX_STALE_S", "3600"))
+    # Snapshots shared by all workers and kept across restarts (src/utils/env_store.py):
+    # "" = off, sqlite:///path/env_cache.db (one host) or redis://host:6379/0 (replicas too)
+    ENV_CACHE_URL = os.getenv("ENV_CACHE_URL", "")
+    # A snapshot (this worker's or shared) younger than this is used without calling OpenWeather,
+    # which updates about every 10 min. 0 = call it for every request
+    ENV_CACHE_TTL_S = float(os.getenv("ENV_CACHE_TTL_S", "600"))
+    # Cities resolve to coordinates in an offline gazetteer (src/utils/gazetteer.py); readings are
+    # fetched and cached per geohash cell: 4 ~ 39 x 20 km, 5 ~ 5 x 5 km. 0 = per city name
+    ENV_GEOHASH_PRECISION = int(os.getenv("ENV_GEOHASH_PRECISION", "4"))
+    GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", os.path.join(BASE_DIR, "src", "data", "gazetteer.csv"))
+    # /assess looks the city up in the gazetteer before any network call. "normalize": a known city
+    # becomes its label ("London, GB"), any other name goes to OpenWeather as typed (defaults if it
+    # doesn't know it either); "reject": 422 for a city the gazetteer doesn't know, only sensible
+    # with a full city gazetteer (the bundled one has ~500 places); "off": no lookup at all
+    CITY_VALIDATION = os.getenv("CITY_VALIDATION", "normalize").lower()
+
+    # 4. Model Serving
+    # "numeric" = NumPy-only artifact, "sklearn" = joblib models, "auto" = numeric if exported
+    SCORING_BACKEND = os.getenv("SCORING_BACKEND", "auto")
+
+    # Synthetic patients pushed through the pipeline before /ready passes (0 = off)
+    WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "3"))
+    WARMUP_PATIENTS_FILE = os.getenv("WARMUP_PATIENTS_FILE", "")
+
+    # LRU caches for repeated identical assessments (src/api/result_cache.py), 0 = off
+    RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "4096"))
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "4096"))
+
+    # Cascade (src/scoring/screen.py): a small screening forest decides clear-cut patients,
+    # the full ensemble only runs near a risk threshold. Needs model_screen.npz from training
+    CASCADE = os.getenv("CASCADE", "true").lower() == "true"
+    # Share of screened patients also run through the full models, to measure disagreement
+    CASCADE_AUDIT_RATE = float(os.getenv("CASCADE_AUDIT_RATE", "0.02"))
+
+    # Shadow scoring (src/api/shadow.py): a candidate bundle scores live traffic off the request path
+    SHADOW_MODEL_PATH = os.getenv("SHADOW_MODEL_PATH", "")  # directory with the candidate's artifacts, "" = off
+    SHADOW_BACKEND = os.getenv("SHADOW_BACKEND", "auto")
+    # Patients waiting for the candidate; beyond this they're dropped, /assess never waits
+    SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "1024"))
+    # Share of one core the candidate may use (it competes with requests for the CPU and the GIL)
+    SHADOW_MAX_DUTY = float(os.getenv("SHADOW_MAX_DUTY", "0.1"))
+    # Comparisons summarised by GET /admin/shadow
+    SHADOW_WINDOW = int(os.getenv("SHADOW_WINDOW", "10000"))
+
+    # 5. Database
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///heart_app.db")
+    # SQL echo logging is very chatty; only turn it on when debugging queries
+    DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+    # 6. Startup Budget (enforced by tests/test_startup.py)
+    STARTUP_IMPORT_BUDGET_S = float(os.getenv("STARTUP_IMPORT_BUDGET_S", "2.0"))
+    FIRST_REQUEST_BUDGET_S = float(os.getenv("FIRST_REQUEST_BUDGET_S", "0.5"))
+
+    # 7. Observability
+    # Per-stage /assess durations in a Server-Timing response header (histograms are always on /metrics)
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() == "true"
+
+    # Tracing (src/utils/tracing.py): none | console | file | otlp
+    # otlp sends to OTEL_EXPORTER_OTLP_ENDPOINT (default http://localhost:4318)
+    TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+    # Share of new traces kept; requests with a sampled traceparent are always kept
+    TRACE_SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", "0.1"))
+    TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+
+    # Profiling (src/api/profiling.py): every /assess, or only admins sending "X-Profile: 1"
+    PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "false").lower() == "true"
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    # Peak bytes per stage too (tracemalloc: several times slower while a profile runs)
+    PROFILE_TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "false").lower() == "true"
+
+    # 8. Batch Jobs (POST /jobs/assess, src/api/jobs.py)
+    # Uploads and results; must be shared by all workers (and survive restarts)
+    JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(BASE_DIR, "jobs"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "5000"))
+    JOB_MAX_UPLOAD_MB = int(os.getenv("JOB_MAX_UPLOAD_MB", "50"))
+    # A running job with no progress for this long lost its worker and is requeued (checked at
+    # startup, then every JOB_LEASE_S / 2)
+    JOB_LEASE_S = int(os.getenv("JOB_LEASE_S", "120"))
+
+    # 9. Training (src/models/train.py)
+    # Model selection (src/models/selection.py): the fastest candidate whose CV score is
+    # within this much of the best wins (F1 for the classifier, MAE for the regressor)
+    SELECT_F1_TOLERANCE = float(os.getenv("SELECT_F1_TOLERANCE", "0.01"))
+    SELECT_MAE_TOLERANCE = float(os.getenv("SELECT_MAE_TOLERANCE", "0.01"))
+    # Screening forest for the cascade, and how often its band must hold on held-out data
+    SCREEN_TREES = int(os.getenv("SCREEN_TREES", "16"))
+    SCREEN_MAX_DEPTH = int(os.getenv("SCREEN_MAX_DEPTH", "8"))
+    SCREEN_COVERAGE = float(os.getenv("SCREEN_COVERAGE", "0.99"))
+
+    # 10. Admission Control (src/api/admission.py): adaptive concurrency limit on /assess
+    ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+    ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "20"))
+    ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+    ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "200"))
+    # Completions slower than this AND than TOLERANCE x the fastest recent one shrink the
+    # limit (x ADMISSION_BACKOFF); faster ones grow it
+    ADMISSION_TARGET_MS = float(os.getenv("ADMISSION_TARGET_MS", "1000"))
+    ADMISSION_TOLERANCE = float(os.getenv("ADMISSION_TOLERANCE", "2.0"))
+    ADMISSION_BACKOFF = float(os.getenv("ADMISSION_BACKOFF", "0.9"))
+    # Share of the limit kept for users whose last assessment (this recent) was High Risk
+    ADMISSION_PRIORITY_RESERVE = float(os.getenv("ADMISSION_PRIORITY_RESERVE", "0.2"))
+    ADMISSION_PRIORITY_WINDOW_S = int(os.getenv("ADMISSION_PRIORITY_WINDOW_S", "3600"))
 
 # Create the instance we import elsewhere
 settings = Config()
\ No newline at end of file
@@ -1,13 +1,15 @@
 from sqlmodel import SQLModel, create_engine, Session
+from src.config import settings
 # Import both models so the DB knows they exist
 from src.models.user_model import User
 from src.models.prediction_model import Prediction
+from src.models.job_model import AssessmentJob
 
-sqlite_file_name = "heart_app.db"
-sqlite_url = f"sqlite:///{sqlite_file_name}"
+# Defaults to sqlite:///heart_app.db (see Config.DATABASE_URL)
+sqlite_url = settings.DATABASE_URL
 
 # check_same_thread=False is required for SQLite with FastAPI
-engine = create_engine(sqlite_url, echo=True, connect_args={"check_same_thread": False})
+engine = create_engine(sqlite_url, echo=settings.DB_ECHO, connect_args={"check_same_thread": False})
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
@@ -0,0 +1,24 @@
+from typing import Optional
+from datetime import datetime, timezone
+from sqlmodel import Field, SQLModel
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+class AssessmentJob(SQLModel, table=True):
+    """One uploaded file of patients, scored in the background (POST /jobs/assess)."""
+    id: str = Field(primary_key=True)  # uuid4 hex
+    user_id: int = Field(foreign_key="user.id", index=True)
+    filename: str
+
+    # "queued" -> "running" -> "done" | "failed"
+    status: str = Field(default="queued", index=True)
+    rows_total: Optional[int] = None
+    rows_done: int = Field(default=0)
+    error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Bumped after every chunk; a "running" job whose heartbeat went stale lost its worker
+    heartbeat_at: Optional[datetime] = None
@@ -0,0 +1,119 @@
+"""
+Latency-aware model selection for train_models.
+
+GridSearchCV ranks candidates on accuracy alone, so a 200-tree, depth-10 forest
+can win by a hair over one that costs half as much to serve. Here every candidate
+whose CV score is within `tolerance` of the best is refit, timed (one row at a
+time, as /assess scores, and as a batch) and pickled to measure its size. The
+pick is the fastest one on the score/latency Pareto front inside the tolerance.
+
+Given a `numeric` exporter, candidates are ranked on the latency of their NumPy
+export, which is what the API serves by default; the sklearn/xgboost latency is
+kept alongside under "sklearn". Without one, the ranking is sklearn latency.
+"""
+import pickle
+import time
+
+import numpy as np
+from sklearn.base import clone
+
+DEFAULT_REPEATS = 25
+
+
+def measure_latency(predict, X_row, X_batch, repeats=DEFAULT_REPEATS):
+    """Median single-row latency (ms) and per-row batch latency (µs) of `predict`."""
+    predict(X_row)  # first call pays for lazy setup
+    single = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        predict(X_row)
+        single.append(time.perf_counter() - t0)
+
+    batch = []
+    for _ in range(max(repeats // 5, 1)):
+        t0 = time.perf_counter()
+        predict(X_batch)
+        batch.append(time.perf_counter() - t0)
+
+    return {
+        "single_row_ms": round(float(np.median(single)) * 1e3, 4),
+        "batch_row_us": round(float(np.median(batch)) / len(X_batch) * 1e6, 3),
+    }
+
+
+def serialized_kb(estimator):
+    return round(len(pickle.dumps(estimator, protocol=pickle.HIGHEST_PROTOCOL)) / 1024, 1)
+
+
+def pareto_front(candidates):
+    """
+    Marks candidates (dicts with "score", higher is better, and "single_row_ms")
+    that no other candidate beats on one axis without losing on the other.
+    """
+    for c in candidates:
+        c["pareto"] = not any(
+            o["score"] >= c["score"] and o["single_row_ms"] <= c["single_row_ms"]
+            and (o["score"] > c["score"] or o["single_row_ms"] < c["single_row_ms"])
+            for o in candidates
+        )
+    return [c for c in candidates if c["pareto"]]
+
+
+def select_candidate(candidates, tolerance):
+    """The fastest Pareto-optimal candidate scoring within `tolerance` of the best."""
+    best = max(c["score"] for c in candidates)
+    eligible = [c for c in pareto_front(candidates) if c["score"] >= best - tolerance]
+    return min(eligible, key=lambda c: (c["single_row_ms"], -c["score"]))
+
+
+def select_from_search(search, X_train, y_train, X_test, tolerance, predict="predict",
+                       repeats=DEFAULT_REPEATS, numeric=None):
+    """
+    Re-picks the winner of a fitted GridSearchCV. Returns (fitted estimator, report),
+    the report being what goes into the model card. `numeric` maps a fitted
+    estimator to its exported predict (see src.scoring.export.numeric_predictor);
+    "latency_path" in the report says which path the ranking was timed on.
+    """
+    results = search.cv_results_
+    scores = results["mean_test_score"]
+    best = float(np.max(scores))
+    X_row = X_test.iloc[:1] if hasattr(X_test, "iloc") else X_test[:1]
+    X_test_np = np.asarray(X_test, dtype=np.float64)
+
+    candidates, fitted = [], {}
+    for i in np.flatnonzero(scores >= best - tolerance):
+        params = results["params"][i]
+        # best_estimator_ is already refit on the full training set
+        if i == search.best_index_:
+            estimator = search.best_estimator_
+        else:
+            estimator = clone(search.estimator).set_params(**params).fit(X_train, y_train)
+        sklearn_latency = measure_latency(getattr(estimator, predict), X_row, X_test, repeats)
+        candidate = {
+            "params": params,
+            "score": float(scores[i]),
+            "score_std": float(results["std_test_score"][i]),
+            **(measure_latency(numeric(estimator), X_test_np[:1], X_test_np, repeats)
+               if numeric else sklearn_latency),
+            "size_kb": serialized_kb(estimator),
+        }
+        if numeric:
+            candidate["sklearn"] = sklearn_latency
+        fitted[id(candidate)] = estimator
+        candidates.append(candidate)
+
+    chosen = select_candidate(candidates, tolerance)
+    by_score = next(c for c in candidates if c["params"] == results["params"][search.best_index_])
+    report = {
+        "scoring": search.scoring,
+        "tolerance": tolerance,
+        "latency_path": "numeric" if numeric else "sklearn",
+        "candidates_in_grid": len(scores),
+        "candidates_measured": len(candidates),
+        "chosen": chosen,
+        "best_by_score": by_score,
+        "pareto_front": sorted(
+            (c for c in candidates if c["pareto"]), key=lambda c: c["single_row_ms"]
+        ),
+    }
+    return fitted[id(chosen)], report
@@ -1,13 +1,22 @@
 import pandas as pd
 import numpy as np
 import joblib
+import json
 import os
+from datetime import datetime, timezone
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.ensemble import RandomForestRegressor
 from xgboost import XGBClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, mean_absolute_error, classification_report
 from src.config import settings
+from src.scoring.export import export_numeric_model, export_screening_model, numeric_predictor
+from src.scoring.numeric_model import NUMERIC_MODEL_FILE, FUSION_WEIGHTS
+from src.scoring.loader import SCREEN_MODEL_FILE
+from src.scoring.screen import DECISION_THRESHOLDS, calibrate_band
+from src.models.selection import select_from_search
+
+MODEL_CARD_FILE = "model_card.json"
 
 def train_models():
     print(" Starting High-Performance Training Pipeline...")
@@ -71,7 +80,14 @@ def train_models():
     )
 
     xgb_grid_search.fit(X_train, y_class_train)
-    clf = xgb_grid_search.best_estimator_
+    # Not simply best_estimator_: the fastest candidate within SELECT_F1_TOLERANCE of it
+    clf, clf_selection = select_from_search(
+        xgb_grid_search, X_train, y_class_train, X_test, settings.SELECT_F1_TOLERANCE, predict="predict_proba",
+        numeric=numeric_predictor
+    )
+    print(f"XGBoost pick: {clf_selection['chosen']['params']} "
+          f"({clf_selection['chosen']['single_row_ms']:.2f} ms/row vs "
+          f"{clf_selection['best_by_score']['single_row_ms']:.2f} ms for the top F1)")
     # Detailed Evaluation
     y_pred_class = clf.predict(X_test)
     acc = accuracy_score(y_class_test, y_pred_class)
@@ -97,12 +113,39 @@ def train_models():
 
     rf_grid_search.fit(X_train, y_reg_train)
     print("\nTraining Random Forest Regressor...")
-    reg = rf_grid_search.best_estimator_
+    reg, reg_selection = select_from_search(
+        rf_grid_search, X_train, y_reg_train, X_test, settings.SELECT_MAE_TOLERANCE,
+        numeric=numeric_predictor
+    )
+    print(f"Random Forest pick: {reg_selection['chosen']['params']} "
+          f"({reg_selection['chosen']['single_row_ms']:.2f} ms/row vs "
+          f"{reg_selection['best_by_score']['single_row_ms']:.2f} ms for the top MAE)")
 
     y_pred_reg = reg.predict(X_test)
     mae = mean_absolute_error(y_reg_test, y_pred_reg)
     print(f"Regression MAE: {mae:.2f} / 4.0")
 
+    # ---------------------------------------------------------
+    # MODEL 3: Screening Forest (cascade, see src/scoring/screen.py)
+    # Distilled from the fused output of both models above, so the API can skip
+    # them for patients who are clearly on one side of every risk threshold
+    print("\nTraining Screening Forest...")
+
+    def fused_risk(X_part):
+        w = FUSION_WEIGHTS
+        return clf.predict_proba(X_part)[:, 1] * w['clf'] + (reg.predict(X_part) / w['severity_scale']) * w['reg']
+
+    screen = RandomForestRegressor(
+        n_estimators=settings.SCREEN_TREES, max_depth=settings.SCREEN_MAX_DEPTH, random_state=42
+    )
+    screen.fit(X_train, fused_risk(X_train))
+    # Calibrate on patients the screen never saw
+    screen_pred = screen.predict(X_test)
+    band = calibrate_band(fused_risk(X_test) - screen_pred, settings.SCREEN_COVERAGE)
+    clear = np.all(np.abs(screen_pred[:, None] - np.asarray(DECISION_THRESHOLDS)) > band, axis=1)
+    print(f"Screening band: +/-{band:.3f} at {settings.SCREEN_COVERAGE:.0%} coverage, "
+          f"decides {clear.mean():.1%} of test patients alone")
+
     # ---------------------------------------------------------
     #SAVE EVERYTHING (Including the Scaler!)
 
@@ -116,6 +159,25 @@ def train_models():
     # Save the Scaler. The API needs this to scale the user's input!
     joblib.dump(scaler, os.path.join(save_path, "model_scaler.pkl"))
 
+    # Export the same pipeline as a NumPy-only artifact (no sklearn/xgboost at serve time)
+    export_numeric_model(clf, reg, scaler, X.columns.tolist(), os.path.join(save_path, NUMERIC_MODEL_FILE))
+    export_screening_model(screen, band, settings.SCREEN_COVERAGE, os.path.join(save_path, SCREEN_MODEL_FILE))
+
+    # Model card: what was picked, why, and what it costs to serve
+    card = {
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "data": {"path": data_path, "rows": len(df), "features": X.shape[1], "test_rows": len(X_test)},
+        "classification": {**clf_selection, "test_accuracy": round(acc, 4)},
+        "regression": {**reg_selection, "test_mae": round(mae, 4)},
+        "screen": {
+            "n_estimators": settings.SCREEN_TREES, "max_depth": settings.SCREEN_MAX_DEPTH,
+            "band": round(band, 4), "coverage": settings.SCREEN_COVERAGE,
+            "test_screened_share": round(float(clear.mean()), 4),
+        },
+    }
+    with open(os.path.join(save_path, MODEL_CARD_FILE), "w", encoding="utf-8") as f:
+        json.dump(card, f, indent=2, default=str)
+
     print(f"\n Models + Scaler saved to {save_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+import json
+import math
+import numpy as np
+from src.scoring.numeric_model import (
+    RAW_FEATURES, FORMAT_VERSION, FUSION_WEIGHTS, TreeEnsemble
+)
+from src.scoring.screen import ScreeningModel
+from src.scoring.sklearn_model import NUM_COLS
+
+
+def _pack_trees(trees, strict):
+    """
+    Packs a list of (left, right, feature, threshold, value) node arrays
+    (local indices, -1 = leaf) into one TreeEnsemble with global indices.
+    """
+    lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+    depth = 0
+    offset = 0
+
+    for left, right, feature, threshold, value in trees:
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        idx = np.arange(left.size, dtype=np.int64)
+        is_leaf = left == -1
+
+        # Leaves loop back onto themselves
+        lefts.append(np.where(is_leaf, idx, left) + offset)
+        rights.append(np.where(is_leaf, idx, right) + offset)
+        features.append(np.where(is_leaf, 0, feature).astype(np.int64))
+        thresholds.append(np.where(is_leaf, 0.0, threshold).astype(np.float64))
+        values.append(np.asarray(value, dtype=np.float64))
+        roots.append(offset)
+
+        # Children always come after their parent in both libraries
+        node_depth = np.zeros(left.size, dtype=np.int64)
+        for i in range(left.size):
+            if not is_leaf[i]:
+                node_depth[left[i]] = node_depth[right[i]] = node_depth[i] + 1
+        depth = max(depth, int(node_depth.max()))
+        offset += left.size
+
+    return TreeEnsemble(
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        value=np.concatenate(values),
+        roots=np.asarray(roots, dtype=np.int64),
+        depth=depth,
+        strict=strict,
+    )
+
+
+def _export_xgboost(clf):
+    """Reads the trees and base margin out of a binary:logistic XGBClassifier."""
+    model = json.loads(clf.get_booster().save_raw('json'))
+    learner = model['learner']
+
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Numeric export only supports binary:logistic, got {objective}")
+
+    # base_score is stored in probability space, e.g. "[5.134146E-1]"
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+    base_margin = math.log(base_score / (1.0 - base_score))
+
+    trees = []
+    for tree in learner['gradient_booster']['model']['trees']:
+        trees.append((
+            tree['left_children'],
+            tree['right_children'],
+            tree['split_indices'],
+            # XGBoost splits in float32; leaves keep their weight in split_conditions
+            np.asarray(tree['split_conditions'], dtype=np.float32),
+            np.asarray(tree['split_conditions'], dtype=np.float32),
+        ))
+
+    return _pack_trees(trees, strict=True), base_margin
+
+
+def _export_random_forest(reg):
+    trees = []
+    for est in reg.estimators_:
+        t = est.tree_
+        trees.append((t.children_left, t.children_right, t.feature, t.threshold, t.value[:, 0, 0]))
+    return _pack_trees(trees, strict=False)
+
+
+def numeric_predictor(estimator):
+    """
+    The NumPy-only predict of an exported XGBClassifier (probability) or random
+    forest (mean leaf), on encoded rows: what NumericScorer serves, minus encoding.
+    """
+    if hasattr(estimator, 'get_booster'):
+        trees, base_margin = _export_xgboost(estimator)
+        return lambda X: 1.0 / (1.0 + np.exp(-(trees.leaf_values(X).sum(axis=1) + base_margin)))
+    trees = _export_random_forest(estimator)
+    return lambda X: trees.leaf_values(X).mean(axis=1)
+
+
+def _encoding_plan(columns, scaler):
+    """Maps every training column back to a raw feature (+ category) and its scaling."""
+    scaled = list(getattr(scaler, 'feature_names_in_', NUM_COLS))
+    source, category, mean, scale = [], [], [], []
+
+    for col in columns:
+        if col in RAW_FEATURES:
+            source.append(RAW_FEATURES.index(col))
+            category.append(np.nan)
+        else:
+            # One-hot columns look like "cp_2"
+            name, value = col.rsplit('_', 1)
+            source.append(RAW_FEATURES.index(name))
+            category.append(float(value))
+
+        if col in scaled:
+            i = scaled.index(col)
+            mean.append(scaler.mean_[i])
+            scale.append(scaler.scale_[i])
+        else:
+            mean.append(0.0)
+            scale.append(1.0)
+
+    return {
+        'enc_source': np.asarray(source, dtype=np.int64),
+        'enc_category': np.asarray(category, dtype=np.float64),
+        'enc_mean': np.asarray(mean, dtype=np.float64),
+        'enc_scale': np.asarray(scale, dtype=np.float64),
+    }
+
+
+def export_numeric_model(clf, reg, scaler, columns, path):
+    """
+    Writes the full scoring pipeline (one-hot, scaling, both ensembles, fusion
+    weights) to a single .npz that NumericScorer can load with NumPy alone.
+    """
+    clf_trees, clf_base_margin = _export_xgboost(clf)
+    reg_trees = _export_random_forest(reg)
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'raw_features': RAW_FEATURES,
+        'columns': list(columns),
+        'weights': FUSION_WEIGHTS,
+        'clf_depth': clf_trees.depth,
+        'clf_base_margin': clf_base_margin,
+        'reg_depth': reg_trees.depth,
+    }
+
+    arrays = _encoding_plan(columns, scaler)
+    arrays.update(clf_trees.to_arrays("clf"))
+    arrays.update(reg_trees.to_arrays("reg"))
+
+    np.savez_compressed(path, meta=np.array(json.dumps(meta)), **arrays)
+    return path
+
+
+def export_screening_model(forest, band, coverage, path):
+    """Writes the cascade screening forest and its calibrated band to a .npz."""
+    return ScreeningModel(_export_random_forest(forest), band, coverage).save(path)
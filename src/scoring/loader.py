@@ -0,0 +1,45 @@
+import hashlib
+import os
+
+# Lives here rather than in numeric_model so that importing the loader
+# (and therefore the API) doesn't pull in NumPy before the first load
+NUMERIC_MODEL_FILE = "model_numeric.npz"
+SCREEN_MODEL_FILE = "model_screen.npz"
+
+
+def artifact_version(*paths):
+    """Short content hash of the model files; tells loaded models apart (e.g. in cache keys)."""
+    digest = hashlib.blake2b(digest_size=6)
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def load_scorer(model_path, backend="auto"):
+    """
+    Picks the scoring backend.
+    "numeric" -> NumPy-only artifact, "sklearn" -> original joblib models,
+    "auto"    -> numeric if the artifact has been exported, sklearn otherwise.
+    """
+    numeric_file = os.path.join(model_path, NUMERIC_MODEL_FILE)
+
+    if backend == "numeric" or (backend == "auto" and os.path.exists(numeric_file)):
+        from src.scoring.numeric_model import NumericScorer
+        return NumericScorer.load(numeric_file)
+
+    if backend in ("auto", "sklearn"):
+        from src.scoring.sklearn_model import SklearnScorer
+        return SklearnScorer.load(model_path)
+
+    raise ValueError(f"Unknown scoring backend: {backend}")
+
+
+def load_screen(model_path):
+    """The cascade screening model, or None if train_models hasn't written one."""
+    screen_file = os.path.join(model_path, SCREEN_MODEL_FILE)
+    if not os.path.exists(screen_file):
+        return None
+    from src.scoring.screen import ScreeningModel
+    return ScreeningModel.load(screen_file)
@@ -0,0 +1,150 @@
+import json
+import numpy as np
+from src.scoring.loader import NUMERIC_MODEL_FILE, artifact_version
+
+# Raw patient features, in the same order as the columns of heart.csv
+RAW_FEATURES = [
+    'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
+    'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
+]
+
+FORMAT_VERSION = 1
+
+# Layer 1 fusion: base_risk = prob * clf + (severity / severity_scale) * reg
+FUSION_WEIGHTS = {'clf': 0.6, 'reg': 0.4, 'severity_scale': 4.0}
+
+
+class TreeEnsemble:
+    """
+    A forest of binary trees packed into flat NumPy arrays.
+    Leaves point to themselves, so every row can walk every tree in lock-step.
+    """
+
+    def __init__(self, left, right, feature, threshold, value, roots, depth, strict):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        # XGBoost goes left on x < t, scikit-learn on x <= t
+        self.strict = strict
+
+    def leaf_values(self, X):
+        """Returns an (n_rows, n_trees) matrix with the leaf value each row lands on."""
+        # Both libraries compare float32 features, so we do the same
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size))
+
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            thr = self.threshold[node]
+            go_left = x < thr if self.strict else x <= thr
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return self.value[node]
+
+    def to_arrays(self, prefix):
+        return {
+            f"{prefix}_left": self.left,
+            f"{prefix}_right": self.right,
+            f"{prefix}_feature": self.feature,
+            f"{prefix}_threshold": self.threshold,
+            f"{prefix}_value": self.value,
+            f"{prefix}_roots": self.roots,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix, depth, strict):
+        return cls(
+            left=arrays[f"{prefix}_left"],
+            right=arrays[f"{prefix}_right"],
+            feature=arrays[f"{prefix}_feature"],
+            threshold=arrays[f"{prefix}_threshold"],
+            value=arrays[f"{prefix}_value"],
+            roots=arrays[f"{prefix}_roots"],
+            depth=depth,
+            strict=strict,
+        )
+
+
+class NumericScorer:
+    """
+    Pure-NumPy replacement for the joblib/pandas/sklearn/xgboost scoring path.
+    Loads the artifact written by src.scoring.export at training time.
+    """
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.version = None
+        self.columns = meta['columns']
+        self.weights = meta['weights']
+
+        # One-hot + scaling plan: encoded[:, j] = (f(raw[:, source[j]]) - mean[j]) / scale[j]
+        self.enc_source = arrays['enc_source']
+        self.enc_category = arrays['enc_category']
+        self.enc_is_onehot = ~np.isnan(self.enc_category)
+        self.enc_mean = arrays['enc_mean']
+        self.enc_scale = arrays['enc_scale']
+
+        self.clf = TreeEnsemble.from_arrays(arrays, "clf", meta['clf_depth'], strict=True)
+        self.clf_base_margin = meta['clf_base_margin']
+        self.reg = TreeEnsemble.from_arrays(arrays, "reg", meta['reg_depth'], strict=False)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        meta = json.loads(str(arrays.pop('meta')))
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported numeric model format: {meta.get('format_version')}")
+        scorer = cls(meta, arrays)
+        scorer.version = artifact_version(path)
+        return scorer
+
+    # --- ENCODING ---
+    def vectorize(self, patient):
+        """Turns one patient dict into a (1, n_raw) row in RAW_FEATURES order."""
+        return np.array([[float(patient[name]) for name in RAW_FEATURES]])
+
+    def encode(self, raw):
+        """Applies the one-hot encoding and scaling used at training time."""
+        raw = np.asarray(raw, dtype=np.float64)
+        picked = raw[:, self.enc_source]
+        encoded = np.where(self.enc_is_onehot, picked == self.enc_category, picked)
+        return (encoded - self.enc_mean) / self.enc_scale
+
+    # --- INFERENCE ---
+    def predict_encoded(self, X):
+        """Returns (prob_disease, severity_raw) arrays for an encoded matrix."""
+        margin = self.clf.leaf_values(X).sum(axis=1) + self.clf_base_margin
+        prob_disease = 1.0 / (1.0 + np.exp(-margin))
+        severity_raw = self.reg.leaf_values(X).mean(axis=1)
+        return prob_disease, severity_raw
+
+    def predict_raw(self, raw):
+        return self.predict_encoded(self.encode(raw))
+
+    def predict_frame(self, df):
+        """(prob_disease, severity_raw) arrays for a DataFrame of raw patients (bulk scoring)."""
+        return self.predict_raw(df[RAW_FEATURES].to_numpy(dtype=np.float64))
+
+    def encode_patient(self, patient):
+        """One patient dict -> encoded (1, n_features) row."""
+        return self.encode(self.vectorize(patient))
+
+    def score_encoded(self, X):
+        """(prob_disease, severity_raw) floats for one encoded row."""
+        prob_disease, severity_raw = self.predict_encoded(X)
+        return float(prob_disease[0]), float(severity_raw[0])
+
+    def score(self, patient):
+        """Scores a single patient dict, same contract as the sklearn path."""
+        return self.score_encoded(self.encode_patient(patient))
+
+    def base_risk(self, prob_disease, severity_raw):
+        """Fuses both model outputs with the weights stored at training time."""
+        w = self.weights
+        return (prob_disease * w['clf']) + ((severity_raw / w['severity_scale']) * w['reg'])
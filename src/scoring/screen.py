@@ -0,0 +1,73 @@
+"""
+Cascade screening model: a small forest distilled from the full ensemble.
+
+train_models fits it on the full model's base_risk and writes model_screen.npz with
+a conformal band: on held-out patients, |screen - full| stayed within `band` for a
+`coverage` share of them. /assess accepts the screen's score when the total risk is
+further than `band` from every decision threshold (so the full models would have
+landed on the same side of each), and runs the full ensemble otherwise.
+"""
+import json
+import numpy as np
+from src.scoring.loader import artifact_version
+from src.scoring.numeric_model import TreeEnsemble
+
+# Every cut-off applied to total_risk downstream: the 0.3 / 0.7 risk categories,
+# the 0.5 prediction stored in the history, and the recommender's 0.8 "very high" tag
+DECISION_THRESHOLDS = (0.3, 0.5, 0.7, 0.8)
+
+SCREEN_FORMAT_VERSION = 1
+
+
+def calibrate_band(residuals, coverage):
+    """Split-conformal band: the ceil((n + 1) * coverage)-th smallest absolute residual."""
+    residuals = np.sort(np.abs(np.asarray(residuals, dtype=np.float64)))
+    n = residuals.size
+    rank = min(n, int(np.ceil((n + 1) * coverage)))
+    return float(residuals[rank - 1])
+
+
+class ScreeningModel:
+    """Averages a small forest over encoded rows; decides() tells when that is enough."""
+
+    def __init__(self, trees, band, coverage, thresholds=DECISION_THRESHOLDS):
+        self.trees = trees
+        self.band = band
+        self.coverage = coverage
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.version = None
+
+    def predict(self, X):
+        """Estimated base_risk for every encoded row."""
+        return np.clip(self.trees.leaf_values(np.asarray(X)).mean(axis=1), 0.0, 1.0)
+
+    def score_encoded(self, X):
+        """Estimated base_risk for one encoded row, as a float."""
+        return float(self.predict(X)[0])
+
+    def decides(self, total_risk):
+        """True if `total_risk` is clear of every threshold by more than the band."""
+        return bool(np.all(np.abs(total_risk - self.thresholds) > self.band))
+
+    def save(self, path):
+        meta = {
+            'format_version': SCREEN_FORMAT_VERSION,
+            'band': self.band,
+            'coverage': self.coverage,
+            'thresholds': self.thresholds.tolist(),
+            'depth': self.trees.depth,
+        }
+        np.savez_compressed(path, meta=np.array(json.dumps(meta)), **self.trees.to_arrays("screen"))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        meta = json.loads(str(arrays.pop('meta')))
+        if meta.get('format_version') != SCREEN_FORMAT_VERSION:
+            raise ValueError(f"Unsupported screening model format: {meta.get('format_version')}")
+        trees = TreeEnsemble.from_arrays(arrays, "screen", meta['depth'], strict=False)
+        screen = cls(trees, meta['band'], meta['coverage'], meta['thresholds'])
+        screen.version = artifact_version(path)
+        return screen
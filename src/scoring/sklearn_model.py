@@ -0,0 +1,63 @@
+import os
+from src.scoring.loader import artifact_version
+from src.scoring.numeric_model import FUSION_WEIGHTS, RAW_FEATURES
+
+CAT_COLS = ['cp', 'restecg', 'slope', 'thal']
+NUM_COLS = ['age', 'trestbps', 'chol', 'thalach', 'oldpeak']
+
+
+class SklearnScorer:
+    """
+    The original scoring path: joblib artifacts + pandas encoding + sklearn/xgboost.
+    Kept as a fallback when no numeric artifact has been exported yet.
+    """
+
+    def __init__(self, clf, reg, scaler, cols):
+        self.clf = clf
+        self.reg = reg
+        self.scaler = scaler
+        self.columns = cols
+        self.weights = FUSION_WEIGHTS
+        self.version = None
+
+    @classmethod
+    def load(cls, model_path):
+        # Heavy imports stay local so the numeric path never pays for them
+        import joblib
+        paths = {part: os.path.join(model_path, f"model_{name}.pkl") for part, name in
+                 [("clf", "classification"), ("reg", "regression"), ("scaler", "scaler"), ("cols", "columns")]}
+        scorer = cls(**{part: joblib.load(path) for part, path in paths.items()})
+        scorer.version = artifact_version(*paths.values())
+        return scorer
+
+    def encode(self, df):
+        """One-hot + reindex + scale, exactly as the API has always done it."""
+        import pandas as pd
+        df = pd.get_dummies(df, columns=CAT_COLS)
+        df = df.reindex(columns=self.columns, fill_value=0)
+        df[NUM_COLS] = self.scaler.transform(df[NUM_COLS])
+        return df
+
+    def predict_encoded(self, X):
+        return self.clf.predict_proba(X)[:, 1], self.reg.predict(X)
+
+    def predict_frame(self, df):
+        """(prob_disease, severity_raw) arrays for a DataFrame of raw patients (bulk scoring)."""
+        # Integer categories, or get_dummies names them "cp_0.0" instead of "cp_0"
+        raw = df[RAW_FEATURES].astype({col: "int64" for col in CAT_COLS})
+        return self.predict_encoded(self.encode(raw))
+
+    def encode_patient(self, patient):
+        import pandas as pd
+        return self.encode(pd.DataFrame([patient]))
+
+    def score_encoded(self, X):
+        prob_disease, severity_raw = self.predict_encoded(X)
+        return float(prob_disease[0]), float(severity_raw[0])
+
+    def score(self, patient):
+        return self.score_encoded(self.encode_patient(patient))
+
+    def base_risk(self, prob_disease, severity_raw):
+        w = self.weights
+        return (prob_disease * w['clf']) + ((severity_raw / w['severity_scale']) * w['reg'])
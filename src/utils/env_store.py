@@ -0,0 +1,102 @@
+"""
+Environmental snapshots shared by every worker, and kept across restarts.
+
+LiveDataClient keeps each city's latest observation here, with the (wall clock)
+time it was fetched. A worker that finds a snapshot younger than ENV_CACHE_TTL_S
+uses it without calling OpenWeather. One that doesn't takes a short lease on the
+city first: whoever gets it fetches, the others wait for its snapshot. So a city
+is fetched about once per TTL however many workers (or replicas) there are.
+
+ENV_CACHE_URL picks the backend:
+    sqlite:///path/env_cache.db   a file, shared by the workers of one host
+    redis://host:6379/0           shared by replicas too (needs the redis package)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteEnvStore:
+    """Snapshots and leases in one SQLite file (WAL, so readers don't block the writer)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        # One connection per thread, and per process: a forked worker must not reuse the parent's
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS env_snapshot (key TEXT PRIMARY KEY, data TEXT, stored_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS env_lease (key TEXT PRIMARY KEY, expires REAL)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        """(data, stored_at) or None."""
+        row = self._conn().execute("SELECT data, stored_at FROM env_snapshot WHERE key = ?", (key,)).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1])
+
+    def put(self, key, data, stored_at=None):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO env_snapshot (key, data, stored_at) VALUES (?, ?, ?)",
+            (key, json.dumps(data), time.time() if stored_at is None else stored_at),
+        )
+
+    def acquire_lease(self, key, ttl_s):
+        """True if this caller now holds the lease on `key` (none held, or the holder's expired)."""
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO env_lease (key, expires) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET expires = excluded.expires WHERE env_lease.expires < ?",
+            (key, now + ttl_s, now),
+        )
+        return cursor.rowcount == 1
+
+    def release_lease(self, key):
+        self._conn().execute("DELETE FROM env_lease WHERE key = ?", (key,))
+
+
+class RedisEnvStore:
+    """Snapshots as JSON strings, leases as SET NX PX keys."""
+
+    def __init__(self, url=None, client=None, prefix="cardioguard:env:"):
+        if client is None:
+            import redis
+            # RESP2: spoken by every Redis-compatible server (redis-py 8 would open with HELLO 3)
+            client = redis.Redis.from_url(url, protocol=2, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["data"], entry["stored_at"]
+
+    def put(self, key, data, stored_at=None):
+        entry = {"data": data, "stored_at": time.time() if stored_at is None else stored_at}
+        self.client.set(self.prefix + key, json.dumps(entry))
+
+    def acquire_lease(self, key, ttl_s):
+        return bool(self.client.set(self.prefix + "lease:" + key, "1", nx=True, px=max(1, int(ttl_s * 1000))))
+
+    def release_lease(self, key):
+        self.client.delete(self.prefix + "lease:" + key)
+
+
+def build_env_store(url):
+    """Store for ENV_CACHE_URL, or None when it's empty."""
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteEnvStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisEnvStore(url)
+    raise ValueError(f"Unsupported ENV_CACHE_URL: {url}")
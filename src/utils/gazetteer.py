@@ -0,0 +1,180 @@
+"""
+Offline city gazetteer: free-text city names -> coordinates, without a network call.
+
+src/data/gazetteer.csv (name, country code, country, lat, lon) is generated by
+`python -m src.utils.gazetteer` from the IANA time zone database (zone.tab: the
+cities naming each zone, with their coordinates) plus the hand-maintained
+src/data/raw/gazetteer_extra.csv for large cities that name no zone.
+
+Names are matched after normalize(): case, accents, punctuation and spacing don't
+matter, "Saint" and "St" are the same, and a ", country" suffix picks between
+same-named cities ("London, UK"). A few former or local names are aliased.
+
+complete() serves autocomplete (GET /cities) from a sorted array of normalized
+names: one binary search, then a scan of the matches.
+"""
+import csv
+import difflib
+import os
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+
+class Place(namedtuple("Place", "name country_code country lat lon")):
+    __slots__ = ()
+
+    @property
+    def label(self):
+        """ "London, GB": what autocomplete offers and /assess stores; resolves back to this place."""
+        return f"{self.name}, {self.country_code}"
+
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer.csv")
+EXTRA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw", "gazetteer_extra.csv")
+
+# Former, local or common names -> the gazetteer's (normalized) name
+ALIASES = {
+    "kiev": "kyiv", "saigon": "ho chi minh", "ho chi minh city": "ho chi minh",
+    "calcutta": "kolkata", "bombay": "mumbai", "bangalore": "bengaluru", "delhi": "new delhi",
+    "madras": "chennai", "peking": "beijing", "rangoon": "yangon",
+    "new york city": "new york", "nyc": "new york", "washington dc": "washington",
+    "munchen": "munich", "koln": "cologne", "roma": "rome", "milano": "milan", "napoli": "naples",
+    "wien": "vienna", "praha": "prague", "lisboa": "lisbon", "moskva": "moscow", "warszawa": "warsaw",
+    "kobenhavn": "copenhagen", "bruxelles": "brussels", "sevilla": "seville",
+}
+
+# Country suffixes people type that aren't a code or the zone.tab country name
+COUNTRY_ALIASES = {
+    "uk": "GB", "united kingdom": "GB", "great britain": "GB", "england": "GB", "scotland": "GB",
+    "wales": "GB", "northern ireland": "GB", "usa": "US", "united states of america": "US",
+    "america": "US", "south korea": "KR", "czech republic": "CZ", "czechia": "CZ",
+}
+
+
+def normalize(text):
+    """Lower-case, accent-free, single-spaced: "  São  Paulo, BR " -> "sao paulo, br"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = re.sub(r"[^\w,]|_", " ", text)
+    text = re.sub(r"\bsaint\b", "st", text)
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    return ", ".join(part for part in parts if part)
+
+
+class Gazetteer:
+    def __init__(self, places):
+        self.places = list(places)
+        self._by_name = {}
+        self._countries = dict(COUNTRY_ALIASES)
+        for place in self.places:
+            self._by_name.setdefault(normalize(place.name), []).append(place)
+            self._countries.setdefault(place.country_code.lower(), place.country_code)
+            country = normalize(place.country)
+            self._countries.setdefault(country, place.country_code)
+            # "Britain (UK)" -> "britain uk" and "britain"
+            self._countries.setdefault(re.sub(r"\(.*\)", "", place.country).strip().casefold(),
+                                       place.country_code)
+
+        # Prefix index: (normalized name or alias, place) sorted by name
+        entries = [(name, place) for name, places in self._by_name.items() for place in places]
+        entries += [(alias, place) for alias, name in ALIASES.items() for place in self._by_name.get(name, ())]
+        entries.sort(key=lambda entry: (entry[0], entry[1].country_code))
+        self._keys = [name for name, _ in entries]
+        self._entries = [place for _, place in entries]
+
+    def __len__(self):
+        return len(self.places)
+
+    def resolve(self, text):
+        """The Place `text` names, or None if it isn't in the gazetteer."""
+        name, _, qualifier = normalize(text or "").partition(", ")
+        name = ALIASES.get(name, name)
+        places = self._by_name.get(name)
+        if not places:
+            return None
+        if qualifier:
+            code = self._countries.get(qualifier.split(", ")[-1])
+            places = [place for place in places if place.country_code == code]
+            if not places:
+                # "London, Canada": a London, but not one we have coordinates for
+                return None
+        return places[0]
+
+    def complete(self, prefix, limit=10):
+        """Places whose name (or an alias) starts with `prefix`, alphabetically, at most `limit`."""
+        key = normalize(prefix or "").partition(", ")[0]
+        if not key:
+            return []
+        found = []
+        for i in range(bisect_left(self._keys, key), len(self._keys)):
+            if not self._keys[i].startswith(key) or len(found) == limit:
+                break
+            if self._entries[i] not in found:
+                found.append(self._entries[i])
+        return found
+
+    def suggest(self, text, limit=5):
+        """Closest names to a city we don't know (typos): for error messages, not the hot path."""
+        name = normalize(text or "").partition(", ")[0]
+        matches = difflib.get_close_matches(name, self._by_name, n=limit, cutoff=0.6)
+        return [self._by_name[match][0] for match in matches]
+
+
+def load(path=DEFAULT_PATH):
+    with open(path, newline="", encoding="utf-8") as f:
+        return Gazetteer(
+            Place(row["name"], row["country_code"], row["country"], float(row["lat"]), float(row["lon"]))
+            for row in csv.DictReader(f)
+        )
+
+
+@lru_cache(maxsize=None)
+def default(path=DEFAULT_PATH):
+    """The gazetteer at `path`, loaded once per process."""
+    return load(path)
+
+
+def _degrees(text, degree_digits):
+    # zone.tab ISO 6709: sign, degrees, minutes, optional seconds (+513030 = 51°30'30")
+    sign = -1 if text[0] == "-" else 1
+    digits = text[1:]
+    value = int(digits[:degree_digits]) + int(digits[degree_digits:degree_digits + 2]) / 60
+    if len(digits) > degree_digits + 2:
+        value += int(digits[degree_digits + 2:]) / 3600
+    return round(sign * value, 4)
+
+
+def build(tz_dir, extra_path=EXTRA_PATH, out_path=DEFAULT_PATH):
+    """Writes the gazetteer CSV from zone.tab / iso3166.tab in `tz_dir` plus the extra cities."""
+    with open(os.path.join(tz_dir, "iso3166.tab"), encoding="utf-8") as f:
+        countries = dict(line.rstrip("\n").split("\t")[:2] for line in f if not line.startswith("#"))
+
+    places = {}
+    with open(os.path.join(tz_dir, "zone.tab"), encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            code, coordinates, zone = line.rstrip("\n").split("\t")[:3]
+            split = max(coordinates.rfind("+"), coordinates.rfind("-"))
+            name = zone.rsplit("/", 1)[-1].replace("_", " ")
+            places.setdefault((name, code), (_degrees(coordinates[:split], 2), _degrees(coordinates[split:], 3)))
+
+    with open(extra_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            places.setdefault((row["name"], row["country_code"]), (float(row["lat"]), float(row["lon"])))
+
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "country_code", "country", "lat", "lon"])
+        for (name, code), (lat, lon) in sorted(places.items()):
+            writer.writerow([name, code, countries[code], lat, lon])
+    return len(places)
+
+
+if __name__ == "__main__":
+    import tzdata
+    count = build(os.path.join(os.path.dirname(tzdata.__file__), "zoneinfo"))
+    print(f"Wrote {count} places to {DEFAULT_PATH}")
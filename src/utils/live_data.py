@@ -1,72 +1,252 @@
-import requests
+import threading
+import time
+from collections import OrderedDict
+
+from src.api.metrics import LIVE_DATA_SOURCES, OPENWEATHER_HEDGES
 from src.config import settings
+from src.utils import gazetteer, geohash, tracing
+from src.utils.env_store import build_env_store
+from src.utils.resilience import CircuitBreaker, LatencyWindow, hedged
+
+# Areas whose last good observation is kept (served while fresh, and when OpenWeather is down)
+LAST_GOOD_AREAS = 1024
+# How often a worker waiting on another one's fetch checks the shared store
+LEASE_POLL_S = 0.02
 
-class LiveDataClient:
-    BASE_URL_WEATHER = "https://api.openweathermap.org/data/2.5/weather"
-    BASE_URL_POLLUTION = "https://api.openweathermap.org/data/2.5/air_pollution"
 
-    def __init__(self):
+class LiveDataClient:
+    def __init__(self, base_url=None, store=None):
         self.api_key = settings.WEATHER_API_KEY
+        base_url = (base_url or settings.OPENWEATHER_BASE_URL).rstrip("/")
+        self.BASE_URL_WEATHER = f"{base_url}/weather"
+        self.BASE_URL_POLLUTION = f"{base_url}/air_pollution"
         if not self.api_key:
             print("WARNING: No Weather API Key found in .env. Live data will fail.")
 
+        self.timeout = (settings.OPENWEATHER_CONNECT_TIMEOUT_S, settings.OPENWEATHER_READ_TIMEOUT_S)
+        # Open: answer from the last good observation (or defaults) without calling
+        self.breaker = CircuitBreaker(settings.OPENWEATHER_BREAKER_FAILURES, settings.OPENWEATHER_BREAKER_RESET_S)
+        # Per endpoint: a call slower than its recent p95 gets a second, hedged request
+        self.latency = {"weather": LatencyWindow(), "air_pollution": LatencyWindow()}
+        self.last_good = OrderedDict()  # area -> (data, time.time() when fetched)
+        self._lock = threading.Lock()
+
+        # Cities resolve to coordinates offline; readings are fetched and kept per geohash cell,
+        # so spellings of one city, and its neighbours, share them
+        self.precision = settings.ENV_GEOHASH_PRECISION
+        self.gazetteer = gazetteer.default(settings.GAZETTEER_PATH) if self.precision > 0 else None
+
+        # Snapshots shared with the other workers (src/utils/env_store.py), None = per process only
+        self.store = store if store is not None else build_env_store(settings.ENV_CACHE_URL)
+        # A store that keeps failing is skipped for a while rather than slowing every request
+        self.store_breaker = CircuitBreaker(failure_threshold=3, reset_timeout_s=30.0)
+        # Long enough for both calls to time out; a holder that died frees the area after that
+        self.lease_s = 2 * sum(self.timeout)
+
     def get_data(self, city="London"):
         """
         Fetches current weather and pollution. 
         Returns a dictionary with safe defaults if API fails/is offline.
         """
-        try:
-            # 1. Fetch Basic Weather (Temp, Humidity, Coordinates)
-            weather_params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": "metric"  # Get Celsius
-            }
-            r_weather = requests.get(self.BASE_URL_WEATHER, params=weather_params)
-            r_weather.raise_for_status()
-            w_data = r_weather.json()
-
-            # Extract necessary data
-            lat = w_data['coord']['lat']
-            lon = w_data['coord']['lon']
-            temp = w_data['main']['temp']
-            humidity = w_data['main']['humidity']
-            
-            # 2. Fetch Pollution (Needs Lat/Lon from step 1)
-            pollution_params = {
-                "lat": lat,
-                "lon": lon,
-                "appid": self.api_key
-            }
-            r_air = requests.get(self.BASE_URL_POLLUTION, params=pollution_params)
-            r_air.raise_for_status()
-            p_data = r_air.json()
-
-            # Extract AQI (1=Good, 5=Very Poor)
-            # OpenWeather returns AQI in p_data['list'][0]['main']['aqi']
-            aqi = p_data['list'][0]['main']['aqi']
-
-            return {
-                "success": True,
-                "temp": temp,
-                "humidity": humidity,
-                "aqi": aqi,
-                "city": city,
-                "lat": lat,
-                "lon": lon
-            }
+        # Without a key both calls are guaranteed to fail, so skip the round trips
+        if not self.api_key:
+            return self._fallback(city, "No Weather API Key configured")
 
+        area, query = self.locate(city)
+        with self._lock:
+            recent = self.last_good.get(area)
+        if self._fresh(recent):
+            LIVE_DATA_SOURCES.inc("cached")
+            data = recent[0]
+        elif self.store is None:
+            data = self._get_live(area, query)
+        else:
+            shared, leased = self._from_store(area)
+            if shared is not None:
+                LIVE_DATA_SOURCES.inc("shared")
+                self._remember(area, *shared)
+                data = shared[0]
+            else:
+                try:
+                    data = self._get_live(area, query)
+                finally:
+                    if leased:
+                        self._store_call("release_lease", area)
+        return {**data, "city": city}
+
+    def locate(self, city):
+        """
+        (area key, OpenWeather query) for `city`: the geohash cell around its gazetteer
+        coordinates, queried at the cell's centre, or the normalized name if it's unknown.
+        """
+        place = self.gazetteer.resolve(city) if self.gazetteer is not None else None
+        if place is None:
+            return "city:" + gazetteer.normalize(city), {"q": city}
+        cell = geohash.encode(place.lat, place.lon, self.precision)
+        lat, lon = geohash.center(cell)
+        return "cell:" + cell, {"lat": round(lat, 4), "lon": round(lon, 4)}
+
+    def _remember(self, area, data, fetched):
+        with self._lock:
+            self.last_good[area] = (data, fetched)
+            self.last_good.move_to_end(area)
+            if len(self.last_good) > LAST_GOOD_AREAS:
+                self.last_good.popitem(last=False)
+
+    def _get_live(self, area, query):
+        # OpenWeather has been failing: don't make this patient wait for it to fail again
+        if not self.breaker.allow():
+            return self._degraded(area, "OpenWeather circuit open")
+
+        try:
+            data = self._fetch(query)
         except Exception as e:
             # Fallback for when internet is down or key is wrong
-            # We return "average" values so the system doesn't crash
-            return {
-                "success": False,
-                "temp": 20.0,
-                "humidity": 50,
-                "aqi": 1,
-                "city": city,
-                "error": str(e)
-            }
+            if self._upstream_fault(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            return self._degraded(area, str(e))
+
+        self.breaker.record_success()
+        now = time.time()
+        self._remember(area, data, now)
+        if self.store is not None:
+            self._store_call("put", area, data, now)
+        LIVE_DATA_SOURCES.inc("live")
+        return data
+
+    def _store_call(self, method, *args):
+        """Calls the shared store; None if it failed or is being skipped (never raises)."""
+        if not self.store_breaker.allow():
+            return None
+        try:
+            result = getattr(self.store, method)(*args)
+        except Exception as e:
+            self.store_breaker.record_failure()
+            print(f"Environmental store {method} failed: {e}")
+            return None
+        self.store_breaker.record_success()
+        return result
+
+    def _fresh(self, snapshot):
+        return snapshot is not None and time.time() - snapshot[1] < settings.ENV_CACHE_TTL_S
+
+    def _from_store(self, area):
+        """
+        ((data, fetched), False) if fresh in the store, or (None, True) when this worker got the lease and
+        should fetch, or (None, False) when the store is unusable and it should fetch anyway.
+        """
+        snapshot = self._store_call("get", area)
+        deadline = time.monotonic() + self.lease_s
+        while not self._fresh(snapshot):
+            # Nobody fetching (or the holder finished without a result): our turn
+            acquired = self._store_call("acquire_lease", area, self.lease_s)
+            if acquired is not False:
+                return None, bool(acquired)
+            if time.monotonic() > deadline:
+                return None, False
+            # Another worker is fetching this area: wait for its snapshot
+            time.sleep(LEASE_POLL_S)
+            snapshot = self._store_call("get", area)
+        return snapshot, False
+
+    def _get(self, endpoint, url, params):
+        """One GET with timeouts, hedged once it runs past the endpoint's recent p95."""
+        # Imported on first use: keeps requests off the API's cold-start path
+        import requests
+
+        # Built here, inside the caller's span: hedged calls run on pool threads
+        headers = tracing.outbound_headers()
+
+        def call():
+            t0 = time.perf_counter()
+            response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            self.latency[endpoint].add(time.perf_counter() - t0)
+            return response
+
+        hedge_after = self.latency[endpoint].quantile(settings.OPENWEATHER_HEDGE_QUANTILE) \
+            if settings.OPENWEATHER_HEDGE else None
+        response, hedge_sent, hedge_won = hedged(call, hedge_after)
+        if hedge_sent:
+            OPENWEATHER_HEDGES.inc("won" if hedge_won else "lost")
+        return response
+
+    def _fetch(self, query):
+        # 1. Fetch Basic Weather (Temp, Humidity, Coordinates); by name or by coordinates
+        weather_params = {
+            **query,
+            "appid": self.api_key,
+            "units": "metric"  # Get Celsius
+        }
+        with tracing.span("GET openweather /weather", {"url.full": self.BASE_URL_WEATHER}, kind="client"):
+            r_weather = self._get("weather", self.BASE_URL_WEATHER, weather_params)
+        w_data = r_weather.json()
+
+        # Extract necessary data
+        lat = w_data['coord']['lat']
+        lon = w_data['coord']['lon']
+        temp = w_data['main']['temp']
+        humidity = w_data['main']['humidity']
+        # When OpenWeather computed this observation (unix time); it changes every ~10 min
+        fetched_at = w_data.get('dt')
+
+        # 2. Fetch Pollution (Needs Lat/Lon from step 1)
+        pollution_params = {
+            "lat": lat,
+            "lon": lon,
+            "appid": self.api_key
+        }
+        with tracing.span("GET openweather /air_pollution", {"url.full": self.BASE_URL_POLLUTION}, kind="client"):
+            r_air = self._get("air_pollution", self.BASE_URL_POLLUTION, pollution_params)
+        p_data = r_air.json()
+
+        # Extract AQI (1=Good, 5=Very Poor)
+        # OpenWeather returns AQI in p_data['list'][0]['main']['aqi']
+        aqi = p_data['list'][0]['main']['aqi']
+
+        return {
+            "success": True,
+            "temp": temp,
+            "humidity": humidity,
+            "aqi": aqi,
+            "lat": lat,
+            "lon": lon,
+            "fetched_at": fetched_at
+        }
+
+    @staticmethod
+    def _upstream_fault(error):
+        """False for a 4xx answer (unknown city, bad key): OpenWeather itself is fine."""
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        return status is None or status >= 500 or status == 429
+
+    def _degraded(self, area, error):
+        """No live answer: the area's last good observation if recent enough, else defaults."""
+        with self._lock:
+            last = self.last_good.get(area)
+        if last is None and self.store is not None:
+            # Fetched by another worker, or before a restart
+            last = self._store_call("get", area)
+        if last is not None and time.time() - last[1] <= settings.LIVE_DATA_MAX_STALE_S:
+            LIVE_DATA_SOURCES.inc("last_known_good")
+            # Same fetched_at as when it was live, so the result cache still recognises it
+            return {**last[0], "stale": True, "error": error}
+        LIVE_DATA_SOURCES.inc("default")
+        return self._fallback(None, error)
+
+    def _fallback(self, city, error):
+        # We return "average" values so the system doesn't crash
+        return {
+            "success": False,
+            "temp": 20.0,
+            "humidity": 50,
+            "aqi": 1,
+            "city": city,
+            "fetched_at": None,
+            "error": error
+        }
 
 # Quick Test Block
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""
+Guards for calls to an upstream API (OpenWeather, see src/utils/live_data.py).
+
+- CircuitBreaker: after `failure_threshold` consecutive failures the circuit opens
+  and callers answer without calling at all. After `reset_timeout_s` one call is let
+  through as a probe (half-open): success closes the circuit, failure re-opens it.
+- LatencyWindow: recent successful call durations, for the hedging delay.
+- hedged(): when a call hasn't answered by the window's p95, sends the same call
+  again and takes whichever answers first. Costs about 5% extra calls and cuts
+  the upstream's slow tail.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class CircuitBreaker:
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, failure_threshold=5, reset_timeout_s=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        True if the caller may call the upstream. Every allowed call must end in
+        record_success() or record_failure(). When open, the first caller after
+        the reset timeout becomes the probe; the rest keep getting False.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout_s:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+    def state_value(self):
+        """0 closed, 1 half-open, 2 open (for a gauge)."""
+        return {self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[self.state]
+
+
+class LatencyWindow:
+    """The last `size` durations of successful calls."""
+
+    def __init__(self, size=200, min_samples=20):
+        self.min_samples = min_samples
+        self._seconds = deque(maxlen=size)
+
+    def add(self, seconds):
+        self._seconds.append(seconds)
+
+    def quantile(self, q):
+        """The q-quantile in seconds, or None until `min_samples` calls were seen."""
+        seconds = sorted(self._seconds)
+        if len(seconds) < self.min_samples:
+            return None
+        return seconds[min(len(seconds) - 1, int(q * len(seconds)))]
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    # One per process: a gunicorn worker forked from the master doesn't inherit its threads
+    global _pool, _pool_pid
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool_pid != os.getpid():
+                _pool = ThreadPoolExecutor(max_workers=64, thread_name_prefix="upstream")
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def hedged(call, hedge_after_s):
+    """
+    Runs call(). If it hasn't returned after `hedge_after_s`, starts a second call()
+    and returns whichever succeeds first (the other one is left to finish on its own).
+    Returns (result, hedge_sent, hedge_won); raises the last error if both fail.
+    With hedge_after_s None the call just runs in the caller's thread.
+    """
+    if hedge_after_s is None:
+        return call(), False, False
+
+    pool = _executor()
+    first = pool.submit(call)
+    done, _ = wait([first], timeout=hedge_after_s)
+    if done:
+        return first.result(), False, False
+
+    second = pool.submit(call)
+    pending, error = {first, second}, None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), True, future is second
+            error = future.exception()
+    raise error
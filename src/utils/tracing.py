@@ -0,0 +1,214 @@
+"""
+OpenTelemetry tracing for the API, live data and DB layers.
+
+Off by default (TRACE_EXPORTER=none): span() is a nullcontext and nothing from
+OpenTelemetry is imported. setup_tracing() turns it on with one of:
+  console - spans printed to stdout
+  file    - one JSON span per line in TRACE_FILE (offline testing)
+  otlp    - OTLP/HTTP to OTEL_EXPORTER_OTLP_ENDPOINT (collector, Jaeger, Tempo, ...)
+Sampling is parent-based with a TRACE_SAMPLE_RATIO of new traces kept.
+"""
+from contextlib import nullcontext
+
+# Our own tracer (not the global provider), so tests can swap exporters freely
+_tracer = None
+_provider = None
+_db_instrumented = False
+
+
+class JsonLinesSpanExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for finished in spans:
+                f.write(finished.to_json(indent=None) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+
+def _build_exporter(exporter, file_path):
+    if exporter == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if exporter == "file":
+        return JsonLinesSpanExporter(file_path)
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    raise ValueError(f"Unknown TRACE_EXPORTER: {exporter!r} (expected none, console, file or otlp)")
+
+
+def setup_tracing(exporter, sample_ratio=1.0, file_path="traces.jsonl", batch=True):
+    """
+    Enables tracing. `exporter` is a name (see module doc) or a SpanExporter instance.
+    Returns True if tracing is on; False for "none" or when opentelemetry-sdk is missing.
+    """
+    global _tracer, _provider
+    if exporter in (None, "", "none"):
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        print("WARNING: opentelemetry-sdk is not installed. Tracing stays off.")
+        return False
+
+    if isinstance(exporter, str):
+        exporter = _build_exporter(exporter, file_path)
+
+    shutdown_tracing()
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": "cardioguard-api"}),
+        sampler=ParentBased(TraceIdRatioBased(sample_ratio)),
+    )
+    # Batching exports off the request path (the processor survives gunicorn forks)
+    processor = BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter)
+    _provider.add_span_processor(processor)
+    _tracer = _provider.get_tracer("cardioguard")
+    _instrument_db()
+    return True
+
+
+def shutdown_tracing():
+    """Flushes pending spans and turns tracing off."""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = _provider = None
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, attributes=None, kind="internal"):
+    """
+    Context manager: a child of the current span when tracing is on, a no-op otherwise.
+    kind is "internal" or "client" (outgoing calls).
+    """
+    if _tracer is None:
+        return nullcontext()
+    from opentelemetry.trace import SpanKind, get_current_span
+    parent = get_current_span().get_span_context()
+    if parent.is_valid and not parent.trace_flags.sampled:
+        # Unsampled trace: the child would be dropped anyway, skip the SDK work
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes, kind=SpanKind[kind.upper()])
+
+
+def outbound_headers():
+    """W3C traceparent/tracestate headers for an outgoing HTTP call ({} when tracing is off)."""
+    if _tracer is None:
+        return {}
+    from opentelemetry.propagate import inject
+    headers = {}
+    inject(headers)
+    return headers
+
+
+# --- A. HTTP SERVER SPANS ---
+class TracingMiddleware:
+    """
+    Pure ASGI middleware: one SERVER span per HTTP request, continuing the
+    caller's trace if it sent a traceparent header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _tracer is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from opentelemetry.propagate import extract
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+
+        carrier = {k.decode('latin-1'): v.decode('latin-1') for k, v in scope.get("headers", [])}
+        method = scope.get("method", "GET")
+        with _tracer.start_as_current_span(
+            f"{method} {scope.get('path', '')}",
+            context=extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope.get("path", "")},
+        ) as server_span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    server_span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        server_span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # Low-cardinality name once routing has matched, e.g. "GET /jobs/{job_id}"
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    server_span.update_name(f"{method} {route.path}")
+                    server_span.set_attribute("http.route", route.path)
+
+
+# --- B. DB SPANS ---
+def _instrument_db():
+    """One CLIENT span per SQL statement, on every SQLAlchemy engine (registered once)."""
+    global _db_instrumented
+    if _db_instrumented:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _db_instrumented = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _tracer is None or context is None:
+        return
+    from opentelemetry.trace import SpanKind, get_current_span
+    # Only inside a sampled trace: startup DDL and warm-up queries would each be a root trace
+    if not get_current_span().is_recording():
+        return
+    operation = statement.split(None, 1)[0].upper() if statement else "SQL"
+    context._trace_span = _tracer.start_span(
+        f"db.{operation.lower()}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system.name": conn.engine.dialect.name,
+            "db.operation.name": operation,
+            # Parameters are never recorded: they hold patient data
+            "db.query.text": statement,
+        },
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db_span = getattr(context, "_trace_span", None)
+    if db_span is not None:
+        db_span.end()
+        context._trace_span = None
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    db_span = getattr(context, "_trace_span", None)
+    if db_span is not None:
+        from opentelemetry.trace import Status, StatusCode
+        db_span.record_exception(exception_context.original_exception)
+        db_span.set_status(Status(StatusCode.ERROR))
+        db_span.end()
+        context._trace_span = None
@@ -0,0 +1,202 @@
+import pytest
+import subprocess
+import sys
+import os
+
+import numpy as np
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("xgboost")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+from src.config import settings
+from src.scoring.export import export_numeric_model
+from src.scoring.numeric_model import NumericScorer, RAW_FEATURES
+from src.scoring.sklearn_model import SklearnScorer, CAT_COLS, NUM_COLS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def heart_df():
+    return pd.read_csv(os.path.join(settings.DATA_PATH, "raw", "heart.csv"))
+
+
+@pytest.fixture(scope="module")
+def scorers(heart_df, tmp_path_factory):
+    """Small versions of the training pipeline, exported to the numeric format."""
+    X = pd.get_dummies(heart_df[RAW_FEATURES], columns=CAT_COLS, drop_first=True)
+    scaler = StandardScaler()
+    X[NUM_COLS] = scaler.fit_transform(X[NUM_COLS])
+    y = heart_df['target']
+
+    clf = XGBClassifier(n_estimators=20, max_depth=3, eval_metric='logloss', random_state=42)
+    clf.fit(X, y)
+    reg = RandomForestRegressor(n_estimators=10, max_depth=6, random_state=42)
+    reg.fit(X, y)
+
+    path = str(tmp_path_factory.mktemp("models") / "model_numeric.npz")
+    export_numeric_model(clf, reg, scaler, X.columns.tolist(), path)
+    return SklearnScorer(clf, reg, scaler, X.columns.tolist()), NumericScorer.load(path)
+
+
+class TestNumericExport:
+    """The NumPy artifact must reproduce the sklearn/xgboost pipeline"""
+
+    def test_batch_matches_sklearn(self, heart_df, scorers):
+        sk, numeric = scorers
+        prob_sk, sev_sk = sk.predict_encoded(sk.encode(heart_df[RAW_FEATURES].copy()))
+        prob_np, sev_np = numeric.predict_raw(heart_df[RAW_FEATURES].to_numpy(dtype=float))
+
+        assert np.allclose(prob_np, prob_sk, atol=1e-6)
+        assert np.allclose(sev_np, sev_sk, atol=1e-9)
+
+    def test_single_patient_matches_sklearn(self, scorers):
+        sk, numeric = scorers
+        patient = {
+            "age": 50, "sex": 1, "cp": 2, "trestbps": 120, "chol": 200,
+            "fbs": 0, "restecg": 1, "thalach": 150, "exang": 0,
+            "oldpeak": 1.0, "slope": 1, "ca": 0, "thal": 3
+        }
+        assert np.allclose(numeric.score(patient), sk.score(patient), atol=1e-6)
+        assert numeric.base_risk(*numeric.score(patient)) == pytest.approx(
+            sk.base_risk(*sk.score(patient)), abs=1e-6
+        )
+
+    def test_numeric_path_skips_heavy_imports(self):
+        code = (
+            "import sys; import src.scoring.loader; "
+            "heavy = [m for m in ('pandas', 'sklearn', 'xgboost', 'joblib') if m in sys.modules]; "
+            "print(','.join(heavy))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        assert out.returncode == 0, out.stderr
+        assert out.stdout.strip() == ""
+
+
+@pytest.fixture(scope="module")
+def model_dir(scorers, tmp_path_factory):
+    """The small models saved the way src.models.train saves them."""
+    import joblib
+    sk, _ = scorers
+    path = tmp_path_factory.mktemp("bulk_models")
+    for name, obj in [("classification", sk.clf), ("regression", sk.reg),
+                      ("scaler", sk.scaler), ("columns", sk.columns)]:
+        joblib.dump(obj, path / f"model_{name}.pkl")
+    export_numeric_model(sk.clf, sk.reg, sk.scaler, sk.columns, str(path / "model_numeric.npz"))
+    return str(path)
+
+
+class TestBulkScoring:
+    """python -m src.scoring.bulk: chunked, multiprocess, order-preserving"""
+
+    @pytest.mark.parametrize("backend", ["sklearn", "numeric"])
+    def test_scores_match_in_input_order(self, heart_df, scorers, model_dir, tmp_path, backend):
+        from src.scoring import bulk
+        sk, _ = scorers
+        patients = heart_df[RAW_FEATURES].head(300).copy()
+        patients.insert(0, "patient_id", range(1000, 1300))
+        patients.loc[7, "chol"] = np.nan
+        patients.to_csv(tmp_path / "in.csv", index=False)
+
+        stats = bulk.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), workers=2,
+                         chunk_size=64, backend=backend, model_path=model_dir, max_in_flight=2)
+        out = pd.read_csv(tmp_path / "out.csv")
+
+        assert stats["rows"] == 300
+        assert out["patient_id"].tolist() == list(range(1000, 1300))
+        assert out.loc[7, bulk.SCORE_COLUMNS].isna().all()
+
+        valid = patients.drop(index=7)
+        prob, severity = sk.predict_encoded(sk.encode(valid[RAW_FEATURES].astype({c: "int64" for c in CAT_COLS})))
+        assert np.allclose(out.drop(index=7)["prob_disease"], prob, atol=1e-6)
+        assert np.allclose(out.drop(index=7)["base_risk"], sk.base_risk(prob, severity), atol=1e-6)
+
+
+class TestScreening:
+    """Cascade screening forest: exported faithfully, band calibrated on held-out rows"""
+
+    def test_export_matches_forest(self, heart_df, scorers, tmp_path):
+        from src.scoring.export import export_screening_model
+        from src.scoring.loader import load_screen
+        sk, _ = scorers
+        X = sk.encode(heart_df[RAW_FEATURES].copy())
+        target = sk.base_risk(*sk.predict_encoded(X))
+        forest = RandomForestRegressor(n_estimators=4, max_depth=5, random_state=42).fit(X, target)
+
+        export_screening_model(forest, 0.1, 0.99, str(tmp_path / "model_screen.npz"))
+        screen = load_screen(str(tmp_path))
+
+        assert np.allclose(screen.predict(X), np.clip(forest.predict(X), 0, 1), atol=1e-9)
+        assert (screen.band, screen.coverage) == (0.1, 0.99)
+        assert screen.version
+        assert load_screen(str(tmp_path / "missing")) is None
+
+    def test_band_and_decision(self):
+        from src.scoring.screen import ScreeningModel, calibrate_band
+        # 19 held-out residuals: 95% coverage needs the ceil(20 * 0.95) = 19th smallest
+        assert calibrate_band(np.arange(19) / 100, 0.95) == 0.18
+        assert calibrate_band([-0.3, 0.1], 0.5) == 0.3
+
+        screen = ScreeningModel(trees=None, band=0.05, coverage=0.95)
+        assert screen.decides(0.1) and screen.decides(0.6) and screen.decides(0.9)
+        assert not screen.decides(0.27)
+        assert not screen.decides(0.54)
+        assert not screen.decides(0.78)
+
+
+class TestModelSelection:
+    """train_models trades a hair of accuracy for serving latency, within a tolerance"""
+
+    def test_pareto_pick_within_tolerance(self):
+        from src.models.selection import select_candidate
+        candidates = [
+            {"name": "best", "score": 0.90, "single_row_ms": 10.0},
+            {"name": "close", "score": 0.895, "single_row_ms": 4.0},
+            {"name": "dominated", "score": 0.89, "single_row_ms": 6.0},
+            {"name": "fast_but_bad", "score": 0.80, "single_row_ms": 1.0},
+        ]
+        assert select_candidate(candidates, tolerance=0.01)["name"] == "close"
+        assert [c["name"] for c in candidates if not c["pareto"]] == ["dominated"]
+        assert select_candidate(candidates, tolerance=0.0)["name"] == "best"
+
+    def test_select_from_search(self, heart_df):
+        from sklearn.model_selection import GridSearchCV
+        from src.models.selection import select_from_search
+        X, y = heart_df[RAW_FEATURES], heart_df['target']
+        search = GridSearchCV(
+            RandomForestRegressor(max_depth=4, random_state=42), {"n_estimators": [5, 40]},
+            cv=3, scoring="neg_mean_absolute_error"
+        ).fit(X, y)
+
+        # A tolerance that admits both: the smaller forest must win
+        estimator, report = select_from_search(search, X, y, X.head(50), tolerance=1.0, repeats=3)
+        assert estimator.n_estimators == 5
+        assert report["chosen"]["params"] == {"n_estimators": 5}
+        assert report["candidates_measured"] == 2
+        for key in ("single_row_ms", "batch_row_us", "size_kb"):
+            assert report["chosen"][key] > 0
+
+    def test_select_from_search_times_numeric_export(self, heart_df):
+        from sklearn.model_selection import GridSearchCV
+        from src.models.selection import select_from_search
+        from src.scoring.export import numeric_predictor
+        X, y = heart_df[RAW_FEATURES], heart_df['target']
+        search = GridSearchCV(
+            RandomForestRegressor(max_depth=4, random_state=42), {"n_estimators": [5, 40]},
+            cv=3, scoring="neg_mean_absolute_error"
+        ).fit(X, y)
+
+        estimator, report = select_from_search(
+            search, X, y, X.head(50), tolerance=1.0, repeats=3, numeric=numeric_predictor
+        )
+        assert report["latency_path"] == "numeric"
+        assert report["chosen"]["sklearn"]["single_row_ms"] > 0
+        # The export being timed predicts what the forest does
+        assert np.allclose(numeric_predictor(estimator)(X.head(50)), estimator.predict(X.head(50)))
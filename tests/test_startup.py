@@ -0,0 +1,37 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from benchmarks import startup_report
+
+class TestStartupBudget:
+    """Cold start must stay within the budgets in Config (STARTUP_*/FIRST_REQUEST_*)"""
+
+    def test_api_import_within_budget(self):
+        import_s = startup_report.measure_import_time()
+        assert import_s < settings.STARTUP_IMPORT_BUDGET_S, (
+            f"Importing {startup_report.API_MODULE} took {import_s:.3f}s "
+            f"(budget {settings.STARTUP_IMPORT_BUDGET_S}s). "
+            f"Run `python -m benchmarks.startup_report` to see which imports grew."
+        )
+
+    def test_heavy_modules_not_imported(self):
+        profile = startup_report.import_profile(top=1000)
+        loaded = {row["package"] for row in profile["packages"]}
+        for heavy in ("pandas", "sklearn", "xgboost", "joblib", "requests"):
+            assert heavy not in loaded, f"{heavy} is imported at API import time"
+
+    def test_first_request_within_budget(self):
+        result = startup_report.measure_first_request()
+        # A fast error (e.g. models missing) must not pass as a fast first request
+        assert result["first_status"] == 200, f"First /assess returned {result['first_status']}"
+        assert result["first_request_s"] < settings.FIRST_REQUEST_BUDGET_S, (
+            f"First /assess took {result['first_request_s'] * 1e3:.1f}ms "
+            f"(budget {settings.FIRST_REQUEST_BUDGET_S * 1e3:.0f}ms)"
+        )
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("opentelemetry.sdk")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from src.utils import tracing
+from src.utils.live_data import LiveDataClient
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SAMPLED_PARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+def make_app():
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with tracing.span("lookup"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1")).all()
+        return {"headers": tracing.outbound_headers()}
+
+    app.add_middleware(tracing.TracingMiddleware)
+    return TestClient(app)
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    yield exporter
+    tracing.shutdown_tracing()
+
+
+class TestTracing:
+    """Request spans with auth / live data / DB children"""
+
+    def test_off_by_default(self):
+        assert not tracing.setup_tracing("none")
+        assert not tracing.enabled()
+        assert tracing.outbound_headers() == {}
+        with tracing.span("ignored") as s:
+            assert s is None
+
+    def test_request_span_tree(self, exporter):
+        tracing.setup_tracing(exporter, sample_ratio=1.0, batch=False)
+        response = make_app().get("/items/7")
+        assert response.status_code == 200
+
+        spans = {s.name: s for s in exporter.get_finished_spans()}
+        server = spans["GET /items/{item_id}"]
+        assert server.attributes["http.response.status_code"] == 200
+        assert spans["lookup"].parent.span_id == server.context.span_id
+        assert spans["db.select"].parent.span_id == spans["lookup"].context.span_id
+        assert spans["db.select"].attributes["db.query.text"] == "SELECT 1"
+
+        # Outgoing calls carry the same trace id
+        traceparent = response.json()["headers"]["traceparent"]
+        assert traceparent.split("-")[1] == format(server.context.trace_id, "032x")
+
+    def test_continues_incoming_trace(self, exporter):
+        # Ratio 0 drops new traces, but a sampled parent is always followed
+        tracing.setup_tracing(exporter, sample_ratio=0.0, batch=False)
+        client = make_app()
+
+        client.get("/items/1")
+        assert exporter.get_finished_spans() == ()
+
+        client.get("/items/1", headers={"traceparent": SAMPLED_PARENT})
+        trace_ids = {format(s.context.trace_id, "032x") for s in exporter.get_finished_spans()}
+        assert trace_ids == {TRACE_ID}
+
+    def test_live_data_injects_traceparent(self, exporter, monkeypatch):
+        import requests
+        tracing.setup_tracing(exporter, sample_ratio=1.0, batch=False)
+        sent_headers = []
+
+        class FakeResponse:
+            def __init__(self, body):
+                self.body = body
+
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return self.body
+
+        def fake_get(url, params=None, headers=None, timeout=None):
+            sent_headers.append(headers)
+            if url.endswith("/weather"):
+                return FakeResponse({"coord": {"lat": 1.0, "lon": 2.0}, "main": {"temp": 21.0, "humidity": 40}})
+            return FakeResponse({"list": [{"main": {"aqi": 2}}]})
+
+        monkeypatch.setattr(requests, "get", fake_get)
+        sensor = LiveDataClient()
+        sensor.api_key = "test"
+        with tracing.span("request"):
+            assert sensor.get_data("London")["success"]
+
+        spans = {s.name: s for s in exporter.get_finished_spans()}
+        for name, headers in zip(["GET openweather /weather", "GET openweather /air_pollution"], sent_headers):
+            assert headers["traceparent"].split("-")[2] == format(spans[name].context.span_id, "016x")